@@ -0,0 +1,422 @@
+"""Asynchronous alert delivery through a durable on-disk outbox.
+
+Alerts (critical context usage, failed compactions, throughput budget) are
+appended to ``Config.outbox_file`` as one line each, so raising one never
+waits on a sink. The outbox file is the queue: a background worker in the one
+process holding the delivery lock reads it, delivers pending alerts to each
+sink in batches, retries failed sinks with exponential backoff, and rewrites
+it without the delivered alerts. All file access is under ``flock``, so any
+number of processes may raise alerts. Alerts with the same key raised within
+``Config.alert_dedup_window`` seconds are dropped.
+
+Sinks are configured in ``Config.alert_sinks`` as strings:
+
+- ``http://...`` / ``https://...``: POST ``{"alerts": [...]}`` as JSON
+- ``exec:<command> [args]``: run the command with one JSON alert per line on stdin
+- ``file:<path>``: append one JSON alert per line
+"""
+
+import fcntl
+import json
+import shlex
+import subprocess
+import threading
+import time
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Callable, Iterator, Optional
+
+from context_guardian.config import Config
+from context_guardian.logger import get_logger
+from context_guardian.state import load_section, save_section
+
+
+class Sink(ABC):
+    """Destination for alert batches."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize the sink.
+
+        Args:
+            name: Stable sink name (its spec string).
+        """
+        self.name = name
+
+    @abstractmethod
+    def send(self, alerts: list[dict]) -> None:
+        """Deliver a batch of alerts.
+
+        Raises:
+            Exception: If delivery failed and should be retried.
+        """
+
+
+class HttpSink(Sink):
+    """POST alert batches as JSON."""
+
+    def __init__(self, url: str, timeout: float) -> None:
+        super().__init__(url)
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alerts: list[dict]) -> None:
+        request = urllib.request.Request(  # noqa: S310
+            self.url,
+            data=json.dumps({"alerts": alerts}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):  # noqa: S310
+            pass
+
+
+class CommandSink(Sink):
+    """Run a command with the alert batch on stdin."""
+
+    def __init__(self, spec: str, timeout: float) -> None:
+        super().__init__(spec)
+        self.argv = shlex.split(spec[len("exec:") :])
+        self.timeout = timeout
+
+    def send(self, alerts: list[dict]) -> None:
+        subprocess.run(  # noqa: S603
+            self.argv,
+            input="".join(json.dumps(alert) + "\n" for alert in alerts),
+            capture_output=True,
+            text=True,
+            timeout=self.timeout,
+            check=True,
+        )
+
+
+class FileSink(Sink):
+    """Append alerts to a file, one JSON object per line."""
+
+    def __init__(self, spec: str) -> None:
+        super().__init__(spec)
+        self.path = Path(spec[len("file:") :]).expanduser()
+
+    def send(self, alerts: list[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.writelines(json.dumps(alert) + "\n" for alert in alerts)
+
+
+def sink_from_spec(spec: str, timeout: float = 5.0) -> Sink:
+    """Build a sink from its configuration string.
+
+    Args:
+        spec: Sink spec (see module docstring).
+        timeout: Delivery timeout for network and command sinks (seconds).
+
+    Returns:
+        The configured sink.
+
+    Raises:
+        ValueError: If the spec is not recognized.
+    """
+    if spec.startswith(("http://", "https://")):
+        return HttpSink(spec, timeout)
+    if spec.startswith("exec:"):
+        return CommandSink(spec, timeout)
+    if spec.startswith("file:"):
+        return FileSink(spec)
+    raise ValueError(f"Unknown alert sink: {spec}")
+
+
+class AlertOutbox:
+    """Durable alert queue with a background delivery worker."""
+
+    def __init__(
+        self,
+        config: Config,
+        sinks: Optional[list[Sink]] = None,
+        clock: Callable[[], float] = time.time,
+        deliver: bool = True,
+    ) -> None:
+        """Initialize the outbox.
+
+        Args:
+            config: Configuration object.
+            sinks: Sinks to deliver to. If None, built from ``config.alert_sinks``.
+            clock: Wall-clock time source (seconds since the epoch).
+            deliver: If False, alerts are only queued; this outbox never starts
+                a delivery worker (for short-lived read-only commands).
+        """
+        self.config = config
+        self.clock = clock
+        self.deliver = deliver
+        self.logger = get_logger(__name__)
+        if sinks is None:
+            sinks = [sink_from_spec(s, config.alert_timeout) for s in config.alert_sinks]
+        self.sinks = {sink.name: sink for sink in sinks}
+
+        self.delivered = 0
+        self.dropped = 0
+        self.pending = 0
+        self._failures = 0
+        self._last_raised: dict[str, float] = {}
+        self._attempts = {name: 0 for name in self.sinks}
+        self._retry_at = {name: 0.0 for name in self.sinks}
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self._owner: Optional[IO[str]] = None
+
+        try:
+            self._last_raised = load_section(self.config.state_file, "alerts")
+        except Exception as e:
+            self.logger.warning(f"Failed to load alert state: {e}")
+        self._saved_last_raised = dict(self._last_raised)
+
+        if self.config.outbox_file.exists():
+            try:
+                with self._locked() as f:
+                    self.pending = len(self._read(f)[0])
+            except Exception as e:
+                self.logger.warning(f"Failed to read alert outbox: {e}")
+        if self.sinks and self.pending:
+            self._start()
+
+    @contextmanager
+    def _locked(self) -> Iterator[IO[str]]:
+        """Open the outbox file for appending, holding an exclusive flock."""
+        self.config.outbox_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.config.outbox_file, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield f
+
+    def _read(self, f: IO[str]) -> tuple[list[dict], int]:
+        """Read all entries from a locked outbox file.
+
+        Returns:
+            Valid entries, and the number of corrupt lines skipped.
+        """
+        f.seek(0)
+        entries = []
+        corrupt = 0
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = None
+            if (
+                isinstance(entry, dict)
+                and isinstance(entry.get("id"), str)
+                and isinstance(entry.get("sinks"), list)
+                and isinstance(entry.get("alert"), dict)
+            ):
+                entries.append(entry)
+            else:
+                corrupt += 1
+        if corrupt:
+            self.logger.warning(f"Skipping {corrupt} corrupt alert outbox lines")
+        return entries, corrupt
+
+    def _start(self) -> None:
+        """Start the delivery worker if this process may deliver."""
+        if not self.deliver or self._thread is not None or self._closing:
+            return
+
+        # Only one process delivers at a time; others just append
+        self.config.outbox_file.parent.mkdir(parents=True, exist_ok=True)
+        owner = open(self.config.outbox_file.with_suffix(".lock"), "w")
+        try:
+            fcntl.flock(owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            owner.close()
+            return
+        self._owner = owner
+        self._thread = threading.Thread(
+            target=self._run, name="context-guardian-alerts", daemon=True
+        )
+        self._thread.start()
+
+    def raise_alert(
+        self, kind: str, message: str, key: Optional[str] = None, **details: object
+    ) -> bool:
+        """Queue an alert for delivery without waiting on any sink.
+
+        Appends one line to the outbox file; nothing else is read or written.
+
+        Args:
+            kind: Alert kind (e.g. "critical", "compaction_failed").
+            message: Human-readable message.
+            key: Deduplication key. Defaults to ``kind``.
+            **details: Extra JSON-serializable fields.
+
+        Returns:
+            True if queued, False if dropped as a duplicate or no sinks are configured.
+        """
+        if not self.sinks:
+            return False
+
+        key = key or kind
+        now = self.clock()
+        last = self._last_raised.get(key)
+        if last is not None and now - last < self.config.alert_dedup_window:
+            return False
+        self._last_raised[key] = now
+
+        entry = {
+            "id": uuid.uuid4().hex,
+            "key": key,
+            "raised": now,
+            "alert": {
+                "kind": kind,
+                "message": message,
+                "timestamp": datetime.now().isoformat(),
+                **details,
+            },
+            "sinks": list(self.sinks),
+        }
+        try:
+            with self._locked() as f:
+                f.write(json.dumps(entry) + "\n")
+                self.pending += 1
+        except Exception as e:
+            self.logger.error(f"Failed to persist alert: {e}")
+
+        self._start()
+        self._wake.set()
+        return True
+
+    def _run(self) -> None:
+        """Worker loop: deliver due batches, sleep until the next retry or alert."""
+        while True:
+            self._wake.clear()
+            try:
+                waiting = self._deliver_due()
+            except Exception as e:
+                # Keep the worker alive: this process holds the delivery lock
+                self._failures += 1
+                delay = min(
+                    self.config.alert_retry_base * 2 ** (self._failures - 1),
+                    self.config.alert_retry_max,
+                )
+                self.logger.error(f"Alert delivery failed, retrying in {delay:.1f}s: {e}")
+                if self._closing:
+                    return
+                self._wake.wait(delay)
+                continue
+            self._failures = 0
+            if waiting:
+                wait: Optional[float] = max(
+                    0.0, min(self._retry_at[name] for name in waiting) - self.clock()
+                )
+            else:
+                wait = None
+            if self._closing and (wait is None or wait > 0):
+                return
+            if wait is None or wait > 0:
+                self._wake.wait(wait)
+
+    def _deliver_due(self) -> set[str]:
+        """Deliver one batch to every sink that is not backing off.
+
+        Returns:
+            Names of sinks that still have pending alerts.
+        """
+        with self._locked() as f:
+            entries = self._read(f)[0]
+        self._remember(entries)
+
+        done: dict[str, set[str]] = {}
+        for name, sink in self.sinks.items():
+            if self.clock() < self._retry_at[name]:
+                continue
+            batch = [e for e in entries if name in e["sinks"]][: self.config.alert_batch_size]
+            if not batch:
+                continue
+
+            try:
+                sink.send([e["alert"] for e in batch])
+            except Exception as e:
+                self._attempts[name] += 1
+                if self._attempts[name] < self.config.alert_max_attempts:
+                    delay = min(
+                        self.config.alert_retry_base * 2 ** (self._attempts[name] - 1),
+                        self.config.alert_retry_max,
+                    )
+                    self._retry_at[name] = self.clock() + delay
+                    self.logger.warning(f"Alert sink {name} failed, retrying in {delay:.1f}s: {e}")
+                    continue
+                self.logger.error(f"Alert sink {name} failed, dropping {len(batch)} alerts: {e}")
+                self.dropped += len(batch)
+            else:
+                self.delivered += len(batch)
+
+            self._attempts[name] = 0
+            self._retry_at[name] = 0.0
+            for entry in batch:
+                done.setdefault(entry["id"], set()).add(name)
+
+        # Re-read under the lock: other processes may have appended meanwhile
+        with self._locked() as f:
+            entries, corrupt = self._read(f)
+            changed = bool(done) or corrupt > 0
+            for entry in entries:
+                delivered_to = done.get(entry["id"], set())
+                kept = [s for s in entry["sinks"] if s in self.sinks and s not in delivered_to]
+                changed = changed or len(kept) != len(entry["sinks"])
+                entry["sinks"] = kept
+            entries = [e for e in entries if e["sinks"]]
+            if changed:
+                f.seek(0)
+                f.truncate()
+                f.writelines(json.dumps(entry) + "\n" for entry in entries)
+            self.pending = len(entries)
+        return {name for e in entries for name in e["sinks"]}
+
+    def _remember(self, entries: list[dict]) -> None:
+        """Merge dedup times from queued entries and persist them (worker only)."""
+        cutoff = self.clock() - self.config.alert_dedup_window
+        last_raised = dict(self._last_raised)
+        for entry in entries:
+            key, raised = entry.get("key"), entry.get("raised")
+            if key is not None and raised is not None:
+                last_raised[key] = max(raised, last_raised.get(key, raised))
+        last_raised = {k: t for k, t in last_raised.items() if t > cutoff}
+        if last_raised == self._saved_last_raised:
+            return
+
+        self._last_raised.update(last_raised)
+        self._saved_last_raised = last_raised
+        try:
+            save_section(self.config.state_file, "alerts", last_raised)
+        except Exception as e:
+            self.logger.error(f"Failed to save alert state: {e}")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker after delivering what it can within ``timeout``.
+
+        Alerts still pending stay in the outbox file for the next run. Does
+        nothing if this outbox never started a worker.
+
+        Args:
+            timeout: Seconds to wait. If None, uses ``config.alert_timeout``.
+        """
+        self._closing = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(self.config.alert_timeout if timeout is None else timeout)
+        if self._owner is not None and (self._thread is None or not self._thread.is_alive()):
+            self._owner.close()
+            self._owner = None
+
+    def get_stats(self) -> dict:
+        """Get outbox statistics.
+
+        Returns:
+            Dictionary with outbox information.
+        """
+        return {
+            "pending": self.pending,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "sinks": list(self.sinks),
+        }
@@ -1,12 +1,40 @@
 """Configuration management for Context Guardian."""
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Callable, Mapping, Optional
 
 # Use XDG_RUNTIME_DIR for runtime files (Linux/macOS best practice), fallback to /tmp
 _RUNTIME_DIR = Path(os.environ.get("XDG_RUNTIME_DIR", "/tmp"))  # noqa: S108
 
+_ENV_PREFIX = "CONTEXT_GUARDIAN_"
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _parse_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# Config fields settable as CONTEXT_GUARDIAN_<NAME>, with their parsers
+_ENV_FIELDS: dict[str, Callable[[str], Any]] = {
+    "threshold": int,
+    "check_interval": int,
+    "must_compact_threshold": int,
+    "idle_gap": int,
+    "max_compaction_delay": int,
+    "session_dir": lambda value: Path(value).expanduser(),
+    "throughput_budget": int,
+    "alert_sinks": _parse_list,
+    "log_level": str.upper,
+    "dry_run": _parse_bool,
+}
+
 
 @dataclass
 class Config:
@@ -18,12 +46,63 @@ class Config:
     check_interval: int = 300
     """Check interval in seconds. Default: 300 (5 minutes)."""
 
+    must_compact_threshold: int = 90
+    """Usage (percentage) at which compaction runs even if the agent is active. Default: 90%."""
+
+    idle_gap: int = 60
+    """Seconds without agent activity before a pending compaction runs. Default: 60."""
+
+    max_compaction_delay: int = 900
+    """Longest a pending compaction may wait for an idle window (seconds). Default: 900."""
+
+    idle_poll_interval: int = 15
+    """Check interval while a compaction is pending (seconds). Default: 15."""
+
+    session_dir: Optional[Path] = None
+    """Directory of OpenClaw session files (*.jsonl); their mtimes count as agent activity."""
+
+    throughput_budget: Optional[int] = None
+    """Fleet-wide token budget (tokens/minute). None disables budget checks."""
+
+    throughput_warning: float = 0.9
+    """Fraction of throughput_budget at which the fleet counts as near budget. Default: 0.9."""
+
+    alert_sinks: list[str] = field(default_factory=list)
+    """Alert destinations: "http(s)://...", "exec:<command>" or "file:<path>". Default: none."""
+
+    alert_dedup_window: int = 300
+    """Seconds during which repeats of the same alert are dropped. Default: 300."""
+
+    alert_batch_size: int = 20
+    """Maximum alerts per delivery to a sink. Default: 20."""
+
+    alert_retry_base: float = 1.0
+    """First retry delay for a failing sink (seconds); doubles per attempt. Default: 1.0."""
+
+    alert_retry_max: float = 300.0
+    """Maximum retry delay (seconds). Default: 300."""
+
+    alert_max_attempts: int = 8
+    """Delivery attempts before a batch is dropped for a sink. Default: 8."""
+
+    alert_timeout: float = 5.0
+    """Timeout for one delivery, and for flushing alerts on exit (seconds). Default: 5.0."""
+
+    outbox_file: Path = _RUNTIME_DIR / "context-guardian" / "outbox.jsonl"
+    """File holding alerts not yet delivered."""
+
     history_file: Path = _RUNTIME_DIR / "context-guardian" / "history.json"
     """File to store check history."""
 
     state_file: Path = _RUNTIME_DIR / "context-guardian" / "state.json"
     """File to store transient state."""
 
+    control_socket: Path = _RUNTIME_DIR / "context-guardian" / "control.sock"
+    """Unix socket served by a running guardian (``context-guardian serve``)."""
+
+    control_timeout: float = 2.0
+    """Timeout for control socket requests (seconds). Default: 2.0."""
+
     log_level: str = "INFO"
     """Logging level. Options: DEBUG, INFO, WARNING, ERROR. Default: INFO."""
 
@@ -36,6 +115,58 @@ class Config:
     compaction_timeout: int = 60
     """Timeout for openclaw compact command (seconds). Default: 60."""
 
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None, **overrides: Any) -> "Config":
+        """Build a config from ``CONTEXT_GUARDIAN_*`` environment variables.
+
+        For example ``CONTEXT_GUARDIAN_THRESHOLD=80`` or
+        ``CONTEXT_GUARDIAN_ALERT_SINKS=https://hooks.example/x,file:~/alerts.jsonl``
+        (comma-separated).
+
+        Args:
+            environ: Environment to read. If None, uses os.environ.
+            **overrides: Field values that take precedence over the environment.
+
+        Returns:
+            Config with defaults for anything not set.
+
+        Raises:
+            ValueError: If a variable cannot be parsed or the result is invalid.
+        """
+        environ = os.environ if environ is None else environ
+        values: dict[str, Any] = {}
+        for name, parse in _ENV_FIELDS.items():
+            raw = environ.get(_ENV_PREFIX + name.upper())
+            if raw is None or raw == "":
+                continue
+            try:
+                values[name] = parse(raw)
+            except ValueError as e:
+                raise ValueError(f"Invalid {_ENV_PREFIX}{name.upper()}={raw!r}: {e}") from e
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        config = cls(**values)
+        config.validate()
+        return config
+
+    def validate(self) -> None:
+        """Validate settings that users can change.
+
+        Raises:
+            ValueError: If the threshold is out of range, is above
+                ``must_compact_threshold`` (every compaction would be forced,
+                disabling idle-window scheduling), or the log level is unknown.
+        """
+        self.validate_threshold(self.threshold)
+        if self.threshold > self.must_compact_threshold:
+            raise ValueError(
+                f"Threshold {self.threshold}% is above the must-compact threshold "
+                f"({self.must_compact_threshold}%); raise must_compact_threshold first"
+            )
+        if self.log_level not in LOG_LEVELS:
+            raise ValueError(
+                f"Log level must be one of {', '.join(LOG_LEVELS)}, got {self.log_level!r}"
+            )
+
     @staticmethod
     def validate_threshold(value: int) -> None:
         """Validate threshold is in valid range.
@@ -0,0 +1,255 @@
+"""Unix socket control API for a running Context Guardian.
+
+A guardian started with ``context-guardian serve`` listens on
+``Config.control_socket``. Each connection carries one request and one
+response, both a single line of JSON::
+
+    -> {"command": "status"}
+    <- {"ok": true, "result": {...}}
+
+    -> {"command": "set-threshold", "percentage": 20}
+    <- {"ok": false, "error": "Threshold must be 50-95%, got 20%"}
+
+Commands: ``status``, ``history`` (``limit``), ``set-threshold``
+(``percentage``) and ``check``. Status and history are answered from memory.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from context_guardian.config import Config
+from context_guardian.daemon import ContextGuardian
+from context_guardian.logger import get_logger
+
+_MAX_REQUEST_BYTES = 4096
+
+
+class ControlError(Exception):
+    """Raised when a running guardian rejects a control request."""
+
+
+class NotRunningError(OSError):
+    """Raised when no trusted guardian is listening on the control socket."""
+
+
+def _check_owner(path: Path) -> None:
+    """Ensure ``path`` belongs to the current user.
+
+    Raises:
+        PermissionError: If another user owns the path.
+    """
+    if path.stat().st_uid != os.getuid():
+        raise PermissionError(f"{path} is not owned by the current user")
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    """Handle a single request/response exchange."""
+
+    server: "_ControlSocketServer"
+
+    def handle(self) -> None:
+        line = self.rfile.readline(_MAX_REQUEST_BYTES)
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            response = {"ok": True, "result": self.server.dispatch(request)}
+        except Exception as e:
+            # Always answer, so the client sees the error rather than an empty response
+            response = {"ok": False, "error": str(e) or type(e).__name__}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class _ControlSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, guardian: ContextGuardian) -> None:
+        self.guardian = guardian
+        super().__init__(str(path), _ControlHandler)
+
+    def dispatch(self, request: dict) -> Any:
+        command = request.get("command")
+        if command == "status":
+            return self.guardian.get_status(refresh=False)
+        if command == "history":
+            return self.guardian.get_history(int(request.get("limit", 10)))
+        if command == "set-threshold":
+            self.guardian.set_threshold(int(request["percentage"]))
+            return {"threshold": self.guardian.config.threshold}
+        if command == "check":
+            return {"success": self.guardian.check_and_handle()}
+        raise ValueError(f"Unknown command: {command}")
+
+
+class ControlServer:
+    """Serve the control API for a guardian on a background thread."""
+
+    def __init__(self, guardian: ContextGuardian) -> None:
+        """Initialize the control server.
+
+        Args:
+            guardian: Guardian whose state is exposed over the socket.
+        """
+        self.guardian = guardian
+        self.path = guardian.config.control_socket
+        self.logger = get_logger(__name__)
+        self._server: Optional[_ControlSocketServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Bind the socket and start serving.
+
+        Raises:
+            RuntimeError: If another guardian is already serving on the socket.
+        """
+        # The socket lives in a directory only we can enter, so no other local
+        # user can connect to it or plant one in its place (matters on /tmp)
+        runtime_dir = self.path.parent
+        runtime_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        try:
+            _check_owner(runtime_dir)
+        except PermissionError as e:
+            raise RuntimeError(f"Refusing to serve control socket: {e}") from e
+        runtime_dir.chmod(0o700)
+
+        if self.path.exists():
+            if ControlClient(self.path).is_running():
+                raise RuntimeError(f"Guardian already running on {self.path}")
+            self.path.unlink()  # stale socket from a guardian that died
+
+        self._server = _ControlSocketServer(self.path, self.guardian)
+        self.path.chmod(0o600)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="context-guardian-control", daemon=True
+        )
+        self._thread.start()
+        self.logger.info(f"Control socket listening on {self.path}")
+
+    def stop(self) -> None:
+        """Stop serving and remove the socket file."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ControlClient:
+    """Client for the control API of a running guardian."""
+
+    def __init__(self, path: Path, timeout: float = 2.0) -> None:
+        """Initialize the client.
+
+        Args:
+            path: Control socket path.
+            timeout: Default per-request timeout in seconds.
+        """
+        self.path = path
+        self.timeout = timeout
+
+    def request(self, command: str, timeout: Optional[float] = None, **params: Any) -> Any:
+        """Send one request and return its result.
+
+        Args:
+            command: Command name.
+            timeout: Request timeout in seconds. If None, uses the default.
+            **params: Command parameters.
+
+        Returns:
+            The ``result`` field of the response.
+
+        Raises:
+            NotRunningError: If no guardian owned by the current user is listening.
+            OSError: If the connection failed after it was established.
+            ControlError: If the guardian rejected the request.
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise NotRunningError("Unix sockets are not supported on this platform")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout if timeout is None else timeout)
+            try:
+                _check_owner(self.path)
+                sock.connect(str(self.path))
+            except OSError as e:
+                raise NotRunningError(f"No guardian on {self.path}: {e}") from e
+            sock.sendall(json.dumps({"command": command, **params}).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+
+        if not line:
+            raise ControlError("Empty response from guardian")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ControlError(response.get("error", "Unknown error"))
+        return response["result"]
+
+    def is_running(self) -> bool:
+        """Return True if a guardian answers on the socket."""
+        try:
+            self.request("status")
+            return True
+        except (OSError, ValueError, ControlError):
+            return False
+
+
+class RemoteGuardian:
+    """Stand-in for ContextGuardian that forwards calls to a running guardian.
+
+    Every method raises NotRunningError if no guardian is serving, so callers
+    can fall back to a standalone ContextGuardian.
+    """
+
+    def __init__(self, config: Config) -> None:
+        """Initialize the remote guardian.
+
+        Args:
+            config: Local configuration (socket path and timeouts).
+        """
+        self.config = config
+        self.client = ControlClient(config.control_socket, config.control_timeout)
+
+    def get_status(self) -> dict:
+        """Get the running guardian's status from memory."""
+        result: dict = self.client.request("status")
+        return result
+
+    def get_history(self, limit: int = 10) -> list[dict]:
+        """Get recent history from the running guardian."""
+        result: list[dict] = self.client.request("history", limit=limit)
+        return result
+
+    def set_threshold(self, percentage: int) -> None:
+        """Set the running guardian's threshold.
+
+        Raises:
+            ValueError: If the guardian rejected the threshold.
+        """
+        try:
+            self.client.request("set-threshold", percentage=percentage)
+        except ControlError as e:
+            raise ValueError(str(e)) from e
+
+    def check_and_handle(self) -> bool:
+        """Ask the running guardian to check (and compact if needed) now."""
+        timeout = (
+            self.config.openclaw_timeout
+            + self.config.compaction_timeout
+            + self.config.control_timeout
+        )
+        try:
+            result = self.client.request("check", timeout=timeout)
+        except NotRunningError:
+            raise
+        except (OSError, ControlError):
+            return False
+        return bool(result["success"])
@@ -1,27 +1,54 @@
 """Context Guardian daemon - proactive context management."""
 
+import dataclasses
 import json
 import subprocess
+import threading
+import time
 from datetime import datetime
 from typing import Optional
 
+from context_guardian.alerts import AlertOutbox
 from context_guardian.config import Config
 from context_guardian.logger import get_logger
-from context_guardian.parser import ContextUsage, parse_openclaw_status
+from context_guardian.parser import (
+    ContextLevel,
+    ContextUsage,
+    parse_openclaw_sessions,
+    parse_openclaw_status,
+)
+from context_guardian.scheduler import CompactionDecision, CompactionScheduler
+from context_guardian.throughput import ThroughputMeter
+
+DEFAULT_SESSION = "default"
+"""Session key used when status output has no per-session rows."""
 
 
 class ContextGuardian:
     """Daemon for monitoring and managing OpenClaw context usage."""
 
-    def __init__(self, config: Optional[Config] = None) -> None:
+    def __init__(self, config: Optional[Config] = None, deliver_alerts: bool = True) -> None:
         """Initialize Context Guardian.
 
         Args:
             config: Configuration object. If None, uses default config.
+            deliver_alerts: If False, alerts are queued but never delivered or
+                flushed by this instance (for read-only CLI commands).
         """
         self.config = config or Config()
         self.logger = get_logger(__name__)
         self.history: list[dict] = []
+        self.last_usage: Optional[ContextUsage] = None
+        self.last_check: Optional[str] = None
+        self.awaiting_idle = False
+        self.last_sessions: dict[str, ContextUsage] = {}
+        self._lock = threading.Lock()
+        # Guards in-memory state read by get_status(); never held while openclaw runs
+        self._state_lock = threading.Lock()
+        self.scheduler = CompactionScheduler(self.config)
+        self.throughput = ThroughputMeter(self.config)
+        self.alerts = AlertOutbox(self.config, deliver=deliver_alerts)
+        self.throughput.budget_hooks.append(self._alert_throughput_budget)
         self._load_history()
 
     def _load_history(self) -> None:
@@ -56,9 +83,12 @@ class ContextGuardian:
     def get_context_usage(self) -> Optional[ContextUsage]:
         """Get current context usage from OpenClaw.
 
+        Per-session usage from the same output is kept in ``last_sessions``.
+
         Returns:
             ContextUsage if successful, None if unable to parse.
         """
+        self.last_sessions = {}
         try:
             result = subprocess.run(
                 ["openclaw", "status"],  # noqa: S607
@@ -67,7 +97,9 @@ class ContextGuardian:
                 timeout=self.config.openclaw_timeout,
                 check=False,
             )
-            return parse_openclaw_status(result.stdout + result.stderr)
+            output = result.stdout + result.stderr
+            self.last_sessions = parse_openclaw_sessions(output)
+            return parse_openclaw_status(output)
         except subprocess.TimeoutExpired:
             self.logger.error("openclaw status timeout")
             return None
@@ -78,44 +110,89 @@ class ContextGuardian:
     def check_and_handle(self) -> bool:
         """Check context usage and compact if necessary.
 
+        Safe to call from several threads; checks are serialized.
+
         Returns:
             True if check succeeded, False if check or compaction failed.
         """
+        with self._lock:
+            return self._check_and_handle()
+
+    def _check_and_handle(self) -> bool:
+        """Check and compact without taking the lock (see check_and_handle)."""
+        self.awaiting_idle = False
         usage = self.get_context_usage()
         if usage is None:
             return False
 
-        # Record event
-        event = {
-            "timestamp": datetime.now().isoformat(),
-            "used": usage.used_tokens,
-            "limit": usage.limit_tokens,
-            "percentage": usage.percentage,
-            "action": "check",
-        }
-        self.history.append(event)
-        self._save_history()
+        timestamp = datetime.now().isoformat()
+        with self._state_lock:
+            self.last_usage = usage
+            self.last_check = timestamp
+            self.throughput.observe(self.last_sessions or {DEFAULT_SESSION: usage})
+
+            # Record event
+            event = {
+                "timestamp": timestamp,
+                "used": usage.used_tokens,
+                "limit": usage.limit_tokens,
+                "percentage": usage.percentage,
+                "tokens_per_minute": self.throughput.get_stats()["fleet"]["tokens_per_minute"],
+                "action": "check",
+            }
+            self.history.append(event)
+            self._save_history()
 
         self.logger.info(
             f"Context: {usage.percentage}% ({usage.used_tokens}/{usage.limit_tokens} tokens)"
         )
+        if usage.level is ContextLevel.CRITICAL:
+            self.alerts.raise_alert(
+                "critical",
+                f"Context at {usage.percentage}% ({usage.used_tokens}/{usage.limit_tokens} tokens)",
+                percentage=usage.percentage,
+                used=usage.used_tokens,
+                limit=usage.limit_tokens,
+            )
 
         # Check if compaction needed
-        if usage.percentage >= self.config.threshold:
+        with self._state_lock:
+            self.scheduler.observe(usage)
+            decision = self.scheduler.decide(usage)
+        self.awaiting_idle = decision is CompactionDecision.DEFER
+        if decision is CompactionDecision.DEFER:
+            self.logger.info(
+                f"Context at {usage.percentage}% (threshold: {self.config.threshold}%) - "
+                f"agent active, deferring compaction"
+            )
+        elif decision is CompactionDecision.IDLE and self.throughput.near_budget():
+            # Compaction spends provider tokens too; pace it while the fleet is busy
+            self.logger.info(
+                f"Context at {usage.percentage}% (threshold: {self.config.threshold}%) - "
+                f"fleet near throughput budget, deferring compaction"
+            )
+        elif decision is not CompactionDecision.SKIP:
             self.logger.warning(
                 f"Context at {usage.percentage}% (threshold: {self.config.threshold}%) - "
-                f"Compacting..."
+                f"Compacting ({decision.value})..."
             )
 
+            started = time.monotonic()
             if self.config.dry_run:
                 self.logger.info("DRY RUN: Skipping actual compaction")
             else:
                 if not self._compact():
+                    self.alerts.raise_alert(
+                        "compaction_failed",
+                        f"Compaction failed at {usage.percentage}% context usage",
+                        percentage=usage.percentage,
+                    )
                     return False
-
-            event["action"] = "compact"
-            self.history.append(event)
-            self._save_history()
+            with self._state_lock:
+                self.scheduler.record_compaction(decision, time.monotonic() - started)
+                event["action"] = "compact"
+                self.history.append(event)
+                self._save_history()
 
         return True
 
@@ -147,22 +224,80 @@ class ContextGuardian:
             self.logger.error(f"Compaction error: {e}")
             return False
 
-    def get_status(self) -> dict:
+    def _alert_throughput_budget(self, stats: dict) -> None:
+        """Raise an alert when the fleet nears its throughput budget."""
+        self.alerts.raise_alert(
+            "throughput_budget",
+            f"Fleet throughput {stats['fleet']['tokens_per_minute']} tokens/min is near "
+            f"the budget of {stats['budget']} tokens/min",
+            tokens_per_minute=stats["fleet"]["tokens_per_minute"],
+            budget=stats["budget"],
+        )
+
+    def close(self) -> None:
+        """Flush queued alerts (up to ``alert_timeout``) and stop background work."""
+        self.alerts.close()
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Check every ``check_interval`` seconds until ``stop`` is set.
+
+        While a compaction is deferred for agent activity, checks run every
+        ``idle_poll_interval`` seconds to catch the idle window. A failed
+        compaction is retried at the normal interval.
+
+        Args:
+            stop: Event that ends the loop. If None, runs until interrupted.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.check_and_handle()
+            if self.awaiting_idle:
+                stop.wait(self.config.idle_poll_interval)
+            else:
+                stop.wait(self.config.check_interval)
+
+    def set_threshold(self, percentage: int) -> None:
+        """Validate and apply a new compaction threshold, then persist it.
+
+        Args:
+            percentage: New threshold percentage.
+
+        Raises:
+            ValueError: If threshold is not in [50, 95] or is above
+                ``must_compact_threshold``.
+        """
+        dataclasses.replace(self.config, threshold=percentage).validate()
+        with self._lock, self._state_lock:
+            self.config.threshold = percentage
+            self._save_history()
+
+    def get_status(self, refresh: bool = True) -> dict:
         """Get current status.
 
+        Args:
+            refresh: If True, query openclaw for fresh usage. If False, report
+                the reading from the last check without spawning a process.
+
         Returns:
             Dictionary with status information.
         """
-        usage = self.get_context_usage()
-        return {
-            "threshold": self.config.threshold,
-            "usage": {
-                "percentage": usage.percentage if usage else None,
-                "used": usage.used_tokens if usage else None,
-                "limit": usage.limit_tokens if usage else None,
-            },
-            "history_events": len(self.history),
-        }
+        fresh = self.get_context_usage() if refresh else None
+        # Snapshot under the state lock; a check may be updating it on another thread
+        with self._state_lock:
+            usage = fresh if refresh else self.last_usage
+            return {
+                "threshold": self.config.threshold,
+                "usage": {
+                    "percentage": usage.percentage if usage else None,
+                    "used": usage.used_tokens if usage else None,
+                    "limit": usage.limit_tokens if usage else None,
+                },
+                "history_events": len(self.history),
+                "last_check": self.last_check,
+                "scheduler": self.scheduler.get_stats(),
+                "throughput": self.throughput.get_stats(),
+                "alerts": self.alerts.get_stats(),
+            }
 
     def get_history(self, limit: int = 10) -> list[dict]:
         """Get recent check history.
@@ -173,8 +308,9 @@ class ContextGuardian:
         Returns:
             List of recent history events.
         """
-        return sorted(
-            self.history,
-            key=lambda e: e["timestamp"],
-            reverse=True,
-        )[:limit]
+        with self._state_lock:
+            return sorted(
+                self.history,
+                key=lambda e: e["timestamp"],
+                reverse=True,
+            )[:limit]
@@ -2,9 +2,11 @@
 
 import argparse
 import sys
-from typing import Optional
+import threading
+from typing import Optional, Union
 
-from context_guardian.config import Config
+from context_guardian.config import LOG_LEVELS, Config
+from context_guardian.control import ControlServer, NotRunningError, RemoteGuardian
 from context_guardian.daemon import ContextGuardian
 from context_guardian.logger import setup_logger
 
@@ -27,15 +29,19 @@ Examples:
   %(prog)s check               Check and compact if needed
   %(prog)s history             Show recent check history
   %(prog)s set-threshold 80    Set compaction threshold to 80%
+  %(prog)s serve               Run continuously and serve the control socket
   %(prog)s --help              Show this help message
+
+Settings are read from CONTEXT_GUARDIAN_* environment variables
+(e.g. CONTEXT_GUARDIAN_THRESHOLD, CONTEXT_GUARDIAN_ALERT_SINKS).
         """,
     )
 
     parser.add_argument(
         "--log-level",
-        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
-        default="INFO",
-        help="Logging level (default: INFO)",
+        choices=LOG_LEVELS,
+        default=None,
+        help="Logging level (default: $CONTEXT_GUARDIAN_LOG_LEVEL or INFO)",
     )
 
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
@@ -63,31 +69,72 @@ Examples:
         help="Threshold percentage (50-95%)",
     )
 
+    # serve command
+    subparsers.add_parser("serve", help="Run continuously and serve the control socket")
+
     # Parse arguments
     parsed = parser.parse_args(args)
-    setup_logger(__name__, parsed.log_level)
 
-    # Create config
-    config = Config(log_level=parsed.log_level)
+    # Create config (CONTEXT_GUARDIAN_* environment variables, then flags)
+    config = Config.from_env(log_level=parsed.log_level)
+    setup_logger(__name__, config.log_level)
+
+    if parsed.command == "serve":
+        return cmd_serve(ContextGuardian(config))
 
-    # Create guardian
-    guardian = ContextGuardian(config)
+    if parsed.command is None:
+        parser.print_help()
+        return 1
 
-    # Handle commands
+    # Talk to a running guardian if there is one, otherwise work standalone
+    try:
+        return run_command(parsed, RemoteGuardian(config))
+    except NotRunningError:
+        pass
+
+    # Only check delivers queued alerts; read-only commands never wait on sinks
+    guardian = ContextGuardian(config, deliver_alerts=parsed.command == "check")
+    try:
+        return run_command(parsed, guardian)
+    finally:
+        guardian.close()
+
+
+def run_command(
+    parsed: argparse.Namespace, guardian: Union[ContextGuardian, RemoteGuardian]
+) -> int:
+    """Dispatch a parsed command to its implementation."""
     if parsed.command == "status":
         return cmd_status(guardian)
     elif parsed.command == "check":
         return cmd_check(guardian)
     elif parsed.command == "history":
         return cmd_history(guardian, parsed.limit)
-    elif parsed.command == "set-threshold":
-        return cmd_set_threshold(guardian, parsed.percentage)
     else:
-        parser.print_help()
+        return cmd_set_threshold(guardian, parsed.percentage)
+
+
+def cmd_serve(guardian: ContextGuardian) -> int:
+    """Serve command implementation."""
+    server = ControlServer(guardian)
+    try:
+        server.start()
+    except RuntimeError as e:
+        print(f"✗ Error: {e}")
         return 1
 
+    stop = threading.Event()
+    try:
+        guardian.run(stop)
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        server.stop()
+        guardian.close()
+    return 0
+
 
-def cmd_status(guardian: ContextGuardian) -> int:
+def cmd_status(guardian: Union[ContextGuardian, RemoteGuardian]) -> int:
     """Status command implementation."""
     status = guardian.get_status()
 
@@ -103,17 +150,49 @@ def cmd_status(guardian: ContextGuardian) -> int:
         print("Usage: Unable to parse context")
 
     print(f"History events: {status['history_events']}")
+    if status.get("last_check"):
+        print(f"Last check: {status['last_check']}")
+
+    scheduler = status.get("scheduler")
+    if scheduler:
+        if scheduler["pending_since"] is not None:
+            print("Compaction: pending, waiting for agent to go idle")
+        print(
+            f"Compactions: {scheduler['idle_compactions']} idle, "
+            f"{scheduler['forced_compactions']} forced"
+        )
+        print(f"Stall avoided: {scheduler['stall_avoided_seconds']}s")
+
+    throughput = status.get("throughput")
+    if throughput:
+        fleet = throughput["fleet"]
+        print(
+            f"Throughput: {fleet['tokens_per_minute']} tokens/min, "
+            f"{fleet['tokens_per_hour']} tokens/hour"
+        )
+        if throughput["budget"] is not None:
+            near = " (near budget)" if throughput["near_budget"] else ""
+            print(f"Budget: {throughput['budget']} tokens/min{near}")
+        for key, rates in throughput["agents"].items():
+            print(f"  {key}: {rates['tokens_per_minute']} tokens/min")
+
+    alerts = status.get("alerts")
+    if alerts and alerts["sinks"]:
+        print(
+            f"Alerts: {alerts['pending']} pending, {alerts['delivered']} delivered, "
+            f"{alerts['dropped']} dropped"
+        )
     print("=" * 50 + "\n")
     return 0
 
 
-def cmd_check(guardian: ContextGuardian) -> int:
+def cmd_check(guardian: Union[ContextGuardian, RemoteGuardian]) -> int:
     """Check command implementation."""
     success = guardian.check_and_handle()
     return 0 if success else 1
 
 
-def cmd_history(guardian: ContextGuardian, limit: int) -> int:
+def cmd_history(guardian: Union[ContextGuardian, RemoteGuardian], limit: int) -> int:
     """History command implementation."""
     events = guardian.get_history(limit)
 
@@ -125,18 +204,18 @@ def cmd_history(guardian: ContextGuardian, limit: int) -> int:
         ts = event["timestamp"].split("T")[1].split("+")[0]  # Extract time part
         action = event.get("action", "?")
         percent = event.get("percentage", "?")
-        print(f"{i}. [{ts}] {action}: {percent}%")
+        rate = event.get("tokens_per_minute")
+        suffix = f" ({rate} tokens/min)" if rate is not None else ""
+        print(f"{i}. [{ts}] {action}: {percent}%{suffix}")
 
     print("=" * 50 + "\n")
     return 0
 
 
-def cmd_set_threshold(guardian: ContextGuardian, percentage: int) -> int:
+def cmd_set_threshold(guardian: Union[ContextGuardian, RemoteGuardian], percentage: int) -> int:
     """Set threshold command implementation."""
     try:
-        Config.validate_threshold(percentage)
-        guardian.config.threshold = percentage
-        guardian._save_history()  # Save updated config
+        guardian.set_threshold(percentage)
         print(f"✓ Threshold set to {percentage}%")
         return 0
     except ValueError as e:
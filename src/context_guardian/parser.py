@@ -89,3 +89,26 @@ def parse_openclaw_status(output: str) -> Optional[ContextUsage]:
         limit_tokens=limit,
         percentage=percent,
     )
+
+
+def parse_openclaw_sessions(output: str) -> dict[str, ContextUsage]:
+    """Parse per-session context usage from OpenClaw status output.
+
+    Looks for table rows like: "│ agent:main:main │ 84k/200k (42%) │".
+
+    Args:
+        output: Combined stdout+stderr from openclaw status command.
+
+    Returns:
+        Mapping of session key to ContextUsage (empty if no rows found).
+    """
+    pattern = r"([\w.:/-]+)\s*[│|]\s*([\d.]+)([km])/([\d.]+)([km])\s+\((\d+)%\)"
+    sessions = {}
+    for match in re.finditer(pattern, output, re.IGNORECASE):
+        key, used_str, used_unit, limit_str, limit_unit, percent_str = match.groups()
+        sessions[key] = ContextUsage(
+            used_tokens=parse_token_count(used_str, used_unit),
+            limit_tokens=parse_token_count(limit_str, limit_unit),
+            percentage=int(percent_str),
+        )
+    return sessions
@@ -0,0 +1,212 @@
+"""Idle-window-aware compaction scheduling.
+
+Compacting while an agent is mid-task stalls it for the length of the
+compaction. Once usage crosses ``Config.threshold`` the scheduler defers
+compaction until the agent has been idle for ``Config.idle_gap`` seconds,
+unless usage reaches ``Config.must_compact_threshold`` or compaction has been
+pending for ``Config.max_compaction_delay`` seconds.
+
+Activity is inferred from changes in ``used_tokens`` between checks and from
+the modification times of OpenClaw session files (``Config.session_dir``).
+State is kept in ``Config.state_file`` so one-shot ``check`` runs from a timer
+schedule the same way as a long-running guardian.
+"""
+
+import time
+from enum import Enum
+from typing import Callable, Optional
+
+from context_guardian.config import Config
+from context_guardian.logger import get_logger
+from context_guardian.parser import ContextUsage
+from context_guardian.state import load_section, save_section
+
+
+class CompactionDecision(Enum):
+    """Outcome of a scheduling decision."""
+
+    SKIP = "skip"
+    """Usage is below the threshold."""
+
+    DEFER = "defer"
+    """Usage is over the threshold but the agent is active."""
+
+    IDLE = "idle"
+    """Agent is idle; compact now."""
+
+    FORCED = "forced"
+    """Must-compact threshold or deadline reached; compact regardless of activity."""
+
+
+class CompactionScheduler:
+    """Decide when to compact based on agent activity."""
+
+    def __init__(self, config: Config, clock: Callable[[], float] = time.time) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            config: Configuration object.
+            clock: Wall-clock time source (seconds since the epoch).
+        """
+        self.config = config
+        self.clock = clock
+        self.logger = get_logger(__name__)
+
+        self.last_used: Optional[int] = None
+        self.last_activity: Optional[float] = None
+        self.pending_since: Optional[float] = None
+        self.deferred = False
+        self.idle_compactions = 0
+        self.forced_compactions = 0
+        self.stall_avoided = 0.0
+        self._load_state()
+
+    @property
+    def pending(self) -> bool:
+        """True while a compaction is waiting for an idle window."""
+        return self.pending_since is not None
+
+    def _load_state(self) -> None:
+        """Load scheduler state from file."""
+        try:
+            data = load_section(self.config.state_file, "scheduler")
+        except Exception as e:
+            self.logger.warning(f"Failed to load scheduler state: {e}")
+            return
+
+        self.last_used = data.get("last_used")
+        self.last_activity = data.get("last_activity")
+        self.pending_since = data.get("pending_since")
+        self.deferred = data.get("deferred", False)
+        self.idle_compactions = data.get("idle_compactions", 0)
+        self.forced_compactions = data.get("forced_compactions", 0)
+        self.stall_avoided = data.get("stall_avoided", 0.0)
+
+    def _save_state(self) -> None:
+        """Save scheduler state to file."""
+        try:
+            save_section(
+                self.config.state_file,
+                "scheduler",
+                {
+                    "last_used": self.last_used,
+                    "last_activity": self.last_activity,
+                    "pending_since": self.pending_since,
+                    "deferred": self.deferred,
+                    "idle_compactions": self.idle_compactions,
+                    "forced_compactions": self.forced_compactions,
+                    "stall_avoided": self.stall_avoided,
+                },
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to save scheduler state: {e}")
+
+    def _session_activity(self) -> Optional[float]:
+        """Return the latest session file modification time, if any."""
+        session_dir = self.config.session_dir
+        if session_dir is None or not session_dir.is_dir():
+            return None
+
+        latest: Optional[float] = None
+        for path in session_dir.rglob("*.jsonl"):
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            if latest is None or mtime > latest:
+                latest = mtime
+        return latest
+
+    def observe(self, usage: ContextUsage) -> None:
+        """Record a usage reading and update the last-activity time.
+
+        Args:
+            usage: Latest context usage.
+        """
+        now = self.clock()
+        if self.last_used is not None and usage.used_tokens != self.last_used:
+            self.last_activity = now
+        elif self.last_activity is None:
+            # No history yet: assume the agent may be busy until proven idle
+            self.last_activity = now
+        self.last_used = usage.used_tokens
+
+        session_mtime = self._session_activity()
+        if session_mtime is not None and session_mtime > self.last_activity:
+            self.last_activity = min(session_mtime, now)
+        self._save_state()
+
+    def decide(self, usage: ContextUsage) -> CompactionDecision:
+        """Decide whether to compact now.
+
+        Call after observe() with the same reading.
+
+        Args:
+            usage: Latest context usage.
+
+        Returns:
+            The scheduling decision.
+        """
+        if usage.percentage < self.config.threshold:
+            if self.pending:
+                self.pending_since = None
+                self.deferred = False
+                self._save_state()
+            return CompactionDecision.SKIP
+
+        now = self.clock()
+        if self.pending_since is None:
+            # Persist at once: the deadline must survive one-shot runs that
+            # end in an IDLE or FORCED decision without compacting
+            self.pending_since = now
+            self._save_state()
+
+        if usage.percentage >= self.config.must_compact_threshold:
+            return CompactionDecision.FORCED
+        if now - self.pending_since >= self.config.max_compaction_delay:
+            return CompactionDecision.FORCED
+
+        last_activity = self.last_activity if self.last_activity is not None else now
+        if now - last_activity >= self.config.idle_gap:
+            return CompactionDecision.IDLE
+
+        self.deferred = True
+        self._save_state()
+        return CompactionDecision.DEFER
+
+    def record_compaction(self, decision: CompactionDecision, duration: float) -> None:
+        """Record a completed compaction.
+
+        An idle compaction that was deferred at least once would have stalled
+        the agent for ``duration`` seconds had it run immediately.
+
+        Args:
+            decision: The decision that triggered the compaction.
+            duration: Compaction wall time in seconds.
+        """
+        if decision is CompactionDecision.FORCED:
+            self.forced_compactions += 1
+        else:
+            self.idle_compactions += 1
+            if self.deferred:
+                self.stall_avoided += duration
+
+        self.pending_since = None
+        self.deferred = False
+        # Compaction drops used_tokens; don't mistake that for agent activity
+        self.last_used = None
+        self._save_state()
+
+    def get_stats(self) -> dict:
+        """Get scheduling statistics.
+
+        Returns:
+            Dictionary with scheduler information.
+        """
+        return {
+            "pending_since": self.pending_since,
+            "last_activity": self.last_activity,
+            "idle_compactions": self.idle_compactions,
+            "forced_compactions": self.forced_compactions,
+            "stall_avoided_seconds": round(self.stall_avoided, 3),
+        }
@@ -0,0 +1,58 @@
+"""Shared transient state file for Context Guardian components.
+
+``Config.state_file`` holds one JSON object with a section per component
+(e.g. ``"scheduler"``, ``"throughput"``) so each can persist independently.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+_save_lock = threading.Lock()
+
+
+def load_section(path: Path, key: str) -> dict:
+    """Load one component's section from the state file.
+
+    Args:
+        path: State file path.
+        key: Section name.
+
+    Returns:
+        The section, or an empty dict if the file or section does not exist.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not valid JSON.
+    """
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        section = json.load(f).get(key, {})
+    return section if isinstance(section, dict) else {}
+
+
+def save_section(path: Path, key: str, data: dict) -> None:
+    """Replace one component's section in the state file, keeping the others.
+
+    Args:
+        path: State file path.
+        key: Section name.
+        data: Section contents (JSON-serializable).
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    # Components save from different threads (e.g. the alert worker)
+    with _save_lock:
+        state: dict = {}
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        state[key] = data
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(state, f, indent=2)
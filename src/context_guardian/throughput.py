@@ -0,0 +1,238 @@
+"""Token throughput accounting.
+
+Every check sees ``used_tokens`` per session; the growth between checks is
+the agent's token throughput. ThroughputMeter turns those deltas into
+tokens/minute and tokens/hour per agent and for the whole fleet, using
+fixed-size bucketed ring counters so memory does not grow with uptime.
+
+The growth since the previous reading is spread evenly over the time
+between the two readings, so infrequent checks (a timer running ``check``
+every 10 minutes) do not inflate the rate. A drop in ``used_tokens``
+(compaction or a new session), or a gap longer than the hour window, starts a
+new baseline; it is never counted as negative throughput.
+"""
+
+import time
+from typing import Callable, Optional
+
+from context_guardian.config import Config
+from context_guardian.logger import get_logger
+from context_guardian.parser import ContextUsage
+from context_guardian.state import load_section, save_section
+
+FLEET = "*"
+"""Key of the fleet-wide counters."""
+
+
+class RateCounter:
+    """Sliding-window sum over a ring of time buckets."""
+
+    def __init__(self, window: float, buckets: int) -> None:
+        """Initialize the counter.
+
+        Args:
+            window: Window length in seconds.
+            buckets: Number of buckets the window is divided into.
+        """
+        self.window = window
+        self.width = window / buckets
+        self.counts: list[float] = [0] * buckets
+        self.slots = [-1] * buckets
+
+    def _add_to_slot(self, slot: int, value: float) -> None:
+        i = slot % len(self.counts)
+        if self.slots[i] != slot:
+            self.slots[i] = slot
+            self.counts[i] = 0
+        self.counts[i] += value
+
+    def add(self, value: float, now: float) -> None:
+        """Add a value at time ``now``."""
+        self._add_to_slot(int(now // self.width), value)
+
+    def add_over(self, value: float, start: float, end: float) -> None:
+        """Add a value accrued evenly between ``start`` and ``end``.
+
+        Only the share falling in buckets still inside the window at ``end``
+        is kept.
+        """
+        if end <= start:
+            self.add(value, end)
+            return
+        per_second = value / (end - start)
+        last = int(end // self.width)
+        first = max(int(start // self.width), last - len(self.counts) + 1)
+        for slot in range(first, last + 1):
+            overlap = min(end, (slot + 1) * self.width) - max(start, slot * self.width)
+            if overlap > 0:
+                self._add_to_slot(slot, per_second * overlap)
+
+    def total(self, now: float) -> float:
+        """Sum of values added within the window ending at ``now``."""
+        current = int(now // self.width)
+        n = len(self.counts)
+        return sum(c for c, s in zip(self.counts, self.slots) if 0 <= current - s < n)
+
+    def rate(self, now: float, per: float) -> float:
+        """Average rate over the window, in units per ``per`` seconds."""
+        return self.total(now) * per / self.window
+
+    def to_dict(self) -> dict:
+        """Serialize bucket contents."""
+        return {"counts": self.counts, "slots": self.slots}
+
+    def load(self, data: dict) -> None:
+        """Restore bucket contents saved by to_dict()."""
+        counts, slots = data.get("counts", []), data.get("slots", [])
+        if len(counts) == len(self.counts) and len(slots) == len(self.slots):
+            self.counts, self.slots = list(counts), list(slots)
+
+
+class _AgentMeter:
+    """Counters and baseline for one agent (or the fleet)."""
+
+    def __init__(self) -> None:
+        # Per-minute rate is averaged over 5 minutes so one check interval fits
+        self.minute = RateCounter(window=300, buckets=10)
+        self.hour = RateCounter(window=3600, buckets=60)
+        self.last_used: Optional[int] = None
+        self.last_seen = 0.0
+
+    def add(self, tokens: int, start: float, end: float) -> None:
+        self.minute.add_over(tokens, start, end)
+        self.hour.add_over(tokens, start, end)
+
+    def rates(self, now: float) -> dict:
+        return {
+            "tokens_per_minute": round(self.minute.rate(now, 60)),
+            "tokens_per_hour": round(self.hour.rate(now, 3600)),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "minute": self.minute.to_dict(),
+            "hour": self.hour.to_dict(),
+            "last_used": self.last_used,
+            "last_seen": self.last_seen,
+        }
+
+    def load(self, data: dict) -> None:
+        self.minute.load(data.get("minute", {}))
+        self.hour.load(data.get("hour", {}))
+        self.last_used = data.get("last_used")
+        self.last_seen = data.get("last_seen", 0.0)
+
+
+class ThroughputMeter:
+    """Per-agent and fleet-wide token throughput."""
+
+    def __init__(self, config: Config, clock: Callable[[], float] = time.time) -> None:
+        """Initialize the meter.
+
+        Callables appended to ``budget_hooks`` are called with get_stats() when
+        the fleet first nears ``config.throughput_budget``.
+
+        Args:
+            config: Configuration object.
+            clock: Wall-clock time source (seconds since the epoch).
+        """
+        self.config = config
+        self.clock = clock
+        self.logger = get_logger(__name__)
+        self.agents: dict[str, _AgentMeter] = {}
+        self.fleet = _AgentMeter()
+        self.budget_hooks: list[Callable[[dict], None]] = []
+        self._near_budget = False
+        self._load_state()
+
+    def _load_state(self) -> None:
+        """Load counters from the state file."""
+        try:
+            data = load_section(self.config.state_file, "throughput")
+        except Exception as e:
+            self.logger.warning(f"Failed to load throughput state: {e}")
+            return
+
+        for key, agent_data in data.get("agents", {}).items():
+            meter = _AgentMeter()
+            meter.load(agent_data)
+            self.agents[key] = meter
+        self.fleet.load(data.get("fleet", {}))
+
+    def _save_state(self) -> None:
+        """Save counters to the state file."""
+        try:
+            save_section(
+                self.config.state_file,
+                "throughput",
+                {
+                    "agents": {key: meter.to_dict() for key, meter in self.agents.items()},
+                    "fleet": self.fleet.to_dict(),
+                },
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to save throughput state: {e}")
+
+    def observe(self, sessions: dict[str, ContextUsage]) -> None:
+        """Record one usage reading per agent.
+
+        Args:
+            sessions: Mapping of agent/session key to its current usage.
+        """
+        now = self.clock()
+        for key, usage in sessions.items():
+            meter = self.agents.setdefault(key, _AgentMeter())
+            # After a gap longer than the hour window the growth can't be placed
+            # in any counter; treat the reading as a new baseline
+            fresh = now - meter.last_seen <= meter.hour.window
+            if fresh and meter.last_used is not None and usage.used_tokens > meter.last_used:
+                delta = usage.used_tokens - meter.last_used
+                meter.add(delta, meter.last_seen, now)
+                self.fleet.add(delta, meter.last_seen, now)
+            meter.last_used = usage.used_tokens
+            meter.last_seen = now
+
+        # Forget agents that have been gone for longer than the hour window
+        for key in [k for k, m in self.agents.items() if now - m.last_seen > 3600]:
+            del self.agents[key]
+
+        self._save_state()
+        self._check_budget()
+
+    def near_budget(self) -> bool:
+        """True if fleet tokens/minute is at or above the budget warning level."""
+        budget = self.config.throughput_budget
+        if budget is None:
+            return False
+        rate = self.fleet.minute.rate(self.clock(), 60)
+        return rate >= budget * self.config.throughput_warning
+
+    def _check_budget(self) -> None:
+        """Log and fire budget hooks when the fleet first nears the budget."""
+        near = self.near_budget()
+        if near and not self._near_budget:
+            stats = self.get_stats()
+            self.logger.warning(
+                f"Fleet throughput {stats['fleet']['tokens_per_minute']} tokens/min is near "
+                f"the budget of {self.config.throughput_budget} tokens/min"
+            )
+            for hook in self.budget_hooks:
+                try:
+                    hook(stats)
+                except Exception as e:
+                    self.logger.error(f"Throughput budget hook failed: {e}")
+        self._near_budget = near
+
+    def get_stats(self) -> dict:
+        """Get throughput statistics.
+
+        Returns:
+            Dictionary with fleet and per-agent rates.
+        """
+        now = self.clock()
+        return {
+            "fleet": self.fleet.rates(now),
+            "agents": {key: meter.rates(now) for key, meter in sorted(self.agents.items())},
+            "budget": self.config.throughput_budget,
+            "near_budget": self.near_budget(),
+        }
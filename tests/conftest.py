@@ -7,6 +7,7 @@ from typing import Any, Dict, Generator
 import pytest
 
 from context_guardian.config import Config
+from tests.fixtures.readings import FakeClock
 
 
 @pytest.fixture
@@ -17,9 +18,17 @@ def temp_files() -> Generator[Dict[str, Any], None, None]:
         yield {
             "history": tmppath / "history.json",
             "state": tmppath / "state.json",
+            "control": tmppath / "control.sock",
+            "outbox": tmppath / "outbox.jsonl",
         }
 
 
+@pytest.fixture
+def clock() -> FakeClock:
+    """Fake wall clock for components that take a ``clock`` argument."""
+    return FakeClock()
+
+
 @pytest.fixture
 def config(temp_files: Dict[str, Any]) -> Config:
     """Create test configuration."""
@@ -27,6 +36,8 @@ def config(temp_files: Dict[str, Any]) -> Config:
         threshold=75,
         history_file=temp_files["history"],
         state_file=temp_files["state"],
+        control_socket=temp_files["control"],
+        outbox_file=temp_files["outbox"],
         log_level="WARNING",
         dry_run=False,
     )
@@ -0,0 +1,18 @@
+"""Shared test helpers: a fake clock and usage readings."""
+
+from context_guardian.parser import ContextUsage
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def usage(used: int, limit: int = 200000) -> ContextUsage:
+    """Build a ContextUsage reading."""
+    return ContextUsage(used_tokens=used, limit_tokens=limit, percentage=used * 100 // limit)
@@ -0,0 +1,412 @@
+"""Tests for the alert outbox."""
+
+import dataclasses
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+
+from context_guardian.alerts import (
+    AlertOutbox,
+    CommandSink,
+    FileSink,
+    HttpSink,
+    Sink,
+    sink_from_spec,
+)
+from context_guardian.config import Config
+from context_guardian.daemon import ContextGuardian
+from context_guardian.main import cli
+from context_guardian.parser import ContextUsage
+
+
+class AlertReceiver(ThreadingHTTPServer):
+    """Local HTTP stand-in for a webhook endpoint."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _ReceiverHandler)
+        self.batches: list[list[dict]] = []
+        self.failures = 0
+        self.delay = 0.0
+        self.received = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/alerts"
+
+
+class _ReceiverHandler(BaseHTTPRequestHandler):
+    server: AlertReceiver
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.server.delay)
+        if self.server.failures > 0:
+            self.server.failures -= 1
+            self.send_response(503)
+        else:
+            self.server.batches.append(json.loads(body)["alerts"])
+            self.server.received.set()
+            self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def receiver() -> Generator[AlertReceiver, None, None]:
+    """Running webhook stand-in."""
+    server = AlertReceiver()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def alert_config(config: Config) -> Config:
+    """Config with fast retries."""
+    config.alert_retry_base = 0.05
+    config.alert_retry_max = 0.2
+    config.alert_timeout = 2.0
+    return config
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+    """Poll until condition() is true or timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class FailingSink(Sink):
+    """Sink that always fails."""
+
+    def __init__(self) -> None:
+        super().__init__("failing")
+        self.calls = 0
+
+    def send(self, alerts: list[dict]) -> None:
+        self.calls += 1
+        raise OSError("sink down")
+
+
+class GatedSink(Sink):
+    """Sink that records batches and blocks its first delivery until released."""
+
+    def __init__(self) -> None:
+        super().__init__("gated")
+        self.batches: list[list[dict]] = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def send(self, alerts: list[dict]) -> None:
+        self.entered.set()
+        self.release.wait(5)
+        self.batches.append(alerts)
+
+
+class TestSinks:
+    """Tests for sink construction and delivery."""
+
+    def test_sink_is_abstract(self) -> None:
+        """Test Sink cannot be used without implementing send."""
+        with pytest.raises(TypeError):
+            Sink("incomplete")  # type: ignore[abstract]
+
+    def test_sink_from_spec(self, tmp_path: Path) -> None:
+        """Test spec strings map to sink types."""
+        assert isinstance(sink_from_spec("http://localhost/x"), HttpSink)
+        assert isinstance(sink_from_spec("exec:notify-send guardian"), CommandSink)
+        assert isinstance(sink_from_spec(f"file:{tmp_path}/a.jsonl"), FileSink)
+        with pytest.raises(ValueError, match="Unknown alert sink"):
+            sink_from_spec("smtp://mail")
+
+    def test_file_sink(self, tmp_path: Path) -> None:
+        """Test file sink appends JSON lines."""
+        sink = FileSink(f"file:{tmp_path}/alerts.jsonl")
+        sink.send([{"kind": "a"}, {"kind": "b"}])
+        lines = (tmp_path / "alerts.jsonl").read_text().splitlines()
+        assert [json.loads(line)["kind"] for line in lines] == ["a", "b"]
+
+    def test_command_sink(self, tmp_path: Path) -> None:
+        """Test command sink passes alerts on stdin."""
+        out = tmp_path / "out.txt"
+        script = f"import sys; open({str(out)!r}, 'w').write(sys.stdin.read())"
+        sink = CommandSink(f"exec:{sys.executable} -c {json.dumps(script)}", timeout=10)
+        sink.send([{"kind": "critical"}])
+        assert json.loads(out.read_text()) == {"kind": "critical"}
+
+
+class TestAlertOutbox:
+    """Tests for AlertOutbox."""
+
+    def test_delivers_batch(self, alert_config: Config, receiver: AlertReceiver) -> None:
+        """Test a queued alert is POSTed and removed from the outbox file."""
+        outbox = AlertOutbox(alert_config, sinks=[HttpSink(receiver.url, timeout=2)])
+        outbox.raise_alert("critical", "one")
+
+        assert wait_for(lambda: outbox.delivered == 1)
+        assert receiver.batches[0][0]["message"] == "one"
+        assert alert_config.outbox_file.read_text() == ""
+        outbox.close()
+
+    def test_batches_alerts_queued_during_delivery(self, alert_config: Config) -> None:
+        """Test alerts queued while a delivery is in flight go out together."""
+        alert_config.alert_batch_size = 2
+        sink = GatedSink()
+        outbox = AlertOutbox(alert_config, sinks=[sink])
+        outbox.raise_alert("critical", "first", key="0")
+        assert sink.entered.wait(5)
+        for i in range(1, 4):
+            outbox.raise_alert("critical", f"queued {i}", key=str(i))
+        sink.release.set()
+
+        assert wait_for(lambda: outbox.delivered == 4)
+        assert [len(batch) for batch in sink.batches] == [1, 2, 1]
+        outbox.close()
+
+    def test_retries_with_backoff(self, alert_config: Config, receiver: AlertReceiver) -> None:
+        """Test a failing endpoint is retried until it accepts."""
+        receiver.failures = 2
+        outbox = AlertOutbox(alert_config, sinks=[HttpSink(receiver.url, timeout=2)])
+        outbox.raise_alert("compaction_failed", "failed")
+
+        assert wait_for(lambda: outbox.delivered == 1)
+        assert len(receiver.batches) == 1
+        assert receiver.batches[0][0]["kind"] == "compaction_failed"
+        outbox.close()
+
+    def test_gives_up_after_max_attempts(self, alert_config: Config) -> None:
+        """Test alerts are dropped for a sink after max attempts."""
+        alert_config.alert_max_attempts = 3
+        sink = FailingSink()
+        outbox = AlertOutbox(alert_config, sinks=[sink])
+        outbox.raise_alert("critical", "lost")
+
+        assert wait_for(lambda: outbox.dropped == 1)
+        assert sink.calls == 3
+        assert outbox.get_stats()["pending"] == 0
+        outbox.close()
+
+    def test_deduplicates(self, alert_config: Config, receiver: AlertReceiver) -> None:
+        """Test repeats within the dedup window are dropped."""
+        outbox = AlertOutbox(alert_config, sinks=[HttpSink(receiver.url, timeout=2)])
+        assert outbox.raise_alert("critical", "first")
+        assert not outbox.raise_alert("critical", "again")
+        assert outbox.raise_alert("compaction_failed", "other")
+        outbox.close()
+
+    def test_dedup_window_expires(self, alert_config: Config) -> None:
+        """Test an alert can repeat after the dedup window."""
+        now = [1000.0]
+        outbox = AlertOutbox(alert_config, sinks=[FailingSink()], clock=lambda: now[0])
+        assert outbox.raise_alert("critical", "first")
+        now[0] += alert_config.alert_dedup_window
+        assert outbox.raise_alert("critical", "later")
+        outbox.close(timeout=0)
+
+    def test_durable_across_restart(self, alert_config: Config, receiver: AlertReceiver) -> None:
+        """Test undelivered alerts are picked up by the next outbox."""
+        alert_config.alert_retry_base = 60
+        alert_config.alert_retry_max = 60
+        receiver.failures = 1
+        sink = HttpSink(receiver.url, timeout=2)
+        outbox = AlertOutbox(alert_config, sinks=[sink])
+        outbox.raise_alert("critical", "survives")
+        assert wait_for(lambda: receiver.failures == 0)
+        outbox.close()
+        assert len(alert_config.outbox_file.read_text().splitlines()) == 1
+
+        resumed = AlertOutbox(alert_config, sinks=[sink])
+        assert wait_for(lambda: resumed.delivered == 1)
+        assert receiver.batches[0][0]["message"] == "survives"
+        assert not resumed.raise_alert("critical", "duplicate after restart")
+        resumed.close()
+
+    def test_skips_malformed_entries(self, alert_config: Config, receiver: AlertReceiver) -> None:
+        """Test lines that are not outbox entries are dropped, not fatal to delivery."""
+        alert_config.outbox_file.write_text('{"id": "x"}\n[1, 2]\nnot json\n')
+        outbox = AlertOutbox(alert_config, sinks=[HttpSink(receiver.url, timeout=2)])
+        assert outbox.get_stats()["pending"] == 0
+
+        outbox.raise_alert("critical", "after junk")
+        assert wait_for(lambda: outbox.delivered == 1)
+        assert [[a["message"] for a in batch] for batch in receiver.batches] == [["after junk"]]
+        assert wait_for(lambda: alert_config.outbox_file.read_text() == "")
+        outbox.close()
+
+    def test_worker_survives_errors(self, alert_config: Config, receiver: AlertReceiver) -> None:
+        """Test an unexpected delivery error backs off instead of killing the worker."""
+        outbox = AlertOutbox(alert_config, sinks=[HttpSink(receiver.url, timeout=2)])
+        deliver_due = outbox._deliver_due
+        errors = iter([OSError("disk full")])
+
+        def flaky() -> set[str]:
+            for error in errors:
+                raise error
+            return deliver_due()
+
+        with patch.object(outbox, "_deliver_due", side_effect=flaky):
+            outbox.raise_alert("critical", "eventually")
+            assert wait_for(lambda: outbox.delivered == 1)
+        assert outbox._thread is not None and outbox._thread.is_alive()
+        outbox.close()
+
+    def test_stats_from_memory(self, alert_config: Config) -> None:
+        """Test get_stats does not read the outbox file."""
+        outbox = AlertOutbox(alert_config, sinks=[FailingSink()], deliver=False)
+        outbox.raise_alert("critical", "queued")
+        with patch("builtins.open", side_effect=AssertionError("file read")):
+            assert outbox.get_stats()["pending"] == 1
+
+    def test_slow_sink_does_not_block(self, alert_config: Config, receiver: AlertReceiver) -> None:
+        """Test raising an alert returns immediately while the sink is slow."""
+        receiver.delay = 1.0
+        outbox = AlertOutbox(alert_config, sinks=[HttpSink(receiver.url, timeout=5)])
+
+        started = time.monotonic()
+        for i in range(5):
+            outbox.raise_alert("critical", f"alert {i}", key=str(i))
+        assert time.monotonic() - started < 0.5
+
+        assert receiver.received.wait(5)
+        outbox.close()
+
+
+class TestOutboxProcesses:
+    """Tests for several outboxes sharing one outbox file."""
+
+    def test_raise_only_appends(self, alert_config: Config) -> None:
+        """Test raising an alert writes one outbox line and nothing else."""
+        outbox = AlertOutbox(alert_config, sinks=[FailingSink()], deliver=False)
+        assert outbox.raise_alert("critical", "queued")
+        assert len(alert_config.outbox_file.read_text().splitlines()) == 1
+        assert not alert_config.state_file.exists()
+        assert outbox._thread is None
+
+    def test_single_delivering_process(self, alert_config: Config, receiver: AlertReceiver) -> None:
+        """Test only the lock holder delivers, including alerts others queued."""
+        sink = HttpSink(receiver.url, timeout=2)
+        queued = AlertOutbox(alert_config, sinks=[sink], deliver=False)
+        queued.raise_alert("critical", "from another process", key="a")
+
+        owner = AlertOutbox(alert_config, sinks=[sink])
+        assert owner._thread is not None
+        second = AlertOutbox(alert_config, sinks=[sink])
+        assert second._thread is None
+
+        second.raise_alert("critical", "from a third process", key="b")
+        owner._wake.set()
+        assert wait_for(lambda: owner.delivered == 2)
+        messages = sorted(a["message"] for batch in receiver.batches for a in batch)
+        assert messages == ["from a third process", "from another process"]
+        assert owner.get_stats()["pending"] == 0
+        owner.close()
+        second.close()
+
+
+class TestCliAlerts:
+    """Tests for alert configuration and delivery through cli()."""
+
+    @pytest.fixture
+    def from_env(self, alert_config: Config) -> Generator[None, None, None]:
+        """Route cli() config through the real env parser, with temp file paths."""
+        real_from_env = Config.from_env
+
+        def build(**overrides: object) -> Config:
+            config = real_from_env(**overrides)
+            return dataclasses.replace(
+                config,
+                history_file=alert_config.history_file,
+                state_file=alert_config.state_file,
+                control_socket=alert_config.control_socket,
+                outbox_file=alert_config.outbox_file,
+                alert_timeout=alert_config.alert_timeout,
+            )
+
+        with patch("context_guardian.main.Config.from_env", side_effect=build):
+            yield
+
+    def test_check_delivers_to_env_sink(
+        self, from_env: None, receiver: AlertReceiver, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test CONTEXT_GUARDIAN_ALERT_SINKS configures delivery for check."""
+        monkeypatch.setenv("CONTEXT_GUARDIAN_ALERT_SINKS", receiver.url)
+        usage = ContextUsage(used_tokens=190000, limit_tokens=200000, percentage=95)
+        with patch.object(ContextGuardian, "get_context_usage", return_value=usage), patch.object(
+            ContextGuardian, "_compact", return_value=False
+        ):
+            assert cli(["check"]) == 1
+
+        kinds = [a["kind"] for batch in receiver.batches for a in batch]
+        assert kinds == ["critical", "compaction_failed"]
+
+    @pytest.mark.parametrize("command", [["status"], ["history"], ["set-threshold", "80"]])
+    def test_read_only_commands_do_not_flush(
+        self,
+        from_env: None,
+        alert_config: Config,
+        receiver: AlertReceiver,
+        monkeypatch: pytest.MonkeyPatch,
+        command: list[str],
+    ) -> None:
+        """Test read-only commands never deliver or wait on pending alerts."""
+        receiver.delay = 5.0
+        monkeypatch.setenv("CONTEXT_GUARDIAN_ALERT_SINKS", receiver.url)
+        AlertOutbox(
+            alert_config, sinks=[HttpSink(receiver.url, timeout=5)], deliver=False
+        ).raise_alert("critical", "pending")
+
+        started = time.monotonic()
+        with patch.object(ContextGuardian, "get_context_usage", return_value=None):
+            assert cli(command) == 0
+        assert time.monotonic() - started < 1.0
+        assert len(alert_config.outbox_file.read_text().splitlines()) == 1
+
+
+class TestGuardianAlerts:
+    """Tests for alerts raised by ContextGuardian."""
+
+    def test_critical_and_compaction_failed(
+        self, alert_config: Config, receiver: AlertReceiver
+    ) -> None:
+        """Test critical usage and failed compaction raise alerts."""
+        alert_config.alert_sinks = [receiver.url]
+        guardian = ContextGuardian(alert_config)
+        usage = ContextUsage(used_tokens=190000, limit_tokens=200000, percentage=95)
+        with patch.object(guardian, "get_context_usage", return_value=usage), patch.object(
+            guardian, "_compact", return_value=False
+        ):
+            assert not guardian.check_and_handle()
+
+        assert wait_for(lambda: guardian.alerts.delivered == 2)
+        kinds = [a["kind"] for batch in receiver.batches for a in batch]
+        assert kinds == ["critical", "compaction_failed"]
+        guardian.close()
+
+    def test_tick_latency_with_sink_down(self, alert_config: Config) -> None:
+        """Test checks stay fast while the only sink is unreachable."""
+        alert_config.alert_sinks = ["http://127.0.0.1:9/unreachable"]
+        guardian = ContextGuardian(alert_config)
+        usage = ContextUsage(used_tokens=190000, limit_tokens=200000, percentage=95)
+
+        started = time.monotonic()
+        with patch.object(guardian, "get_context_usage", return_value=usage), patch.object(
+            guardian, "_compact", return_value=False
+        ):
+            guardian.check_and_handle()
+        assert time.monotonic() - started < 0.5
+        assert guardian.get_status(refresh=False)["alerts"]["sinks"] == alert_config.alert_sinks
+        guardian.close()
@@ -0,0 +1,71 @@
+"""Tests for configuration loading."""
+
+from pathlib import Path
+
+import pytest
+
+from context_guardian.config import Config
+
+
+class TestConfigFromEnv:
+    """Tests for Config.from_env."""
+
+    def test_defaults(self) -> None:
+        """Test an empty environment gives the defaults."""
+        assert Config.from_env({}) == Config()
+
+    def test_reads_variables(self) -> None:
+        """Test CONTEXT_GUARDIAN_* variables set their fields."""
+        config = Config.from_env(
+            {
+                "CONTEXT_GUARDIAN_THRESHOLD": "80",
+                "CONTEXT_GUARDIAN_DRY_RUN": "true",
+                "CONTEXT_GUARDIAN_LOG_LEVEL": "debug",
+                "CONTEXT_GUARDIAN_SESSION_DIR": "/var/lib/openclaw",
+                "CONTEXT_GUARDIAN_THROUGHPUT_BUDGET": "50000",
+                "CONTEXT_GUARDIAN_ALERT_SINKS": "http://hooks.local/a, file:/tmp/alerts.jsonl",
+            }
+        )
+        assert config.threshold == 80
+        assert config.dry_run is True
+        assert config.log_level == "DEBUG"
+        assert config.session_dir == Path("/var/lib/openclaw")
+        assert config.throughput_budget == 50000
+        assert config.alert_sinks == ["http://hooks.local/a", "file:/tmp/alerts.jsonl"]
+
+    def test_overrides_win(self) -> None:
+        """Test explicit overrides beat the environment; None overrides are ignored."""
+        env = {"CONTEXT_GUARDIAN_LOG_LEVEL": "ERROR", "CONTEXT_GUARDIAN_THRESHOLD": "80"}
+        config = Config.from_env(env, log_level="DEBUG", threshold=None)
+        assert config.log_level == "DEBUG"
+        assert config.threshold == 80
+
+    @pytest.mark.parametrize(
+        ("env", "error"),
+        [
+            ({"CONTEXT_GUARDIAN_THRESHOLD": "20"}, "50-95%"),
+            ({"CONTEXT_GUARDIAN_THRESHOLD": "92"}, "must-compact threshold"),
+            (
+                {
+                    "CONTEXT_GUARDIAN_THRESHOLD": "80",
+                    "CONTEXT_GUARDIAN_MUST_COMPACT_THRESHOLD": "70",
+                },
+                "must-compact threshold",
+            ),
+            ({"CONTEXT_GUARDIAN_LOG_LEVEL": "verbose"}, "Log level"),
+        ],
+    )
+    def test_invalid_settings(self, env: dict, error: str) -> None:
+        """Test values the CLI would reject are rejected from the environment too."""
+        with pytest.raises(ValueError, match=error):
+            Config.from_env(env)
+
+    def test_raised_must_compact_allows_high_threshold(self) -> None:
+        """Test a high threshold is fine with a higher must-compact threshold."""
+        env = {"CONTEXT_GUARDIAN_THRESHOLD": "92", "CONTEXT_GUARDIAN_MUST_COMPACT_THRESHOLD": "95"}
+        assert Config.from_env(env).threshold == 92
+
+    def test_invalid_value(self) -> None:
+        """Test unparseable values name the variable."""
+        with pytest.raises(ValueError, match="CONTEXT_GUARDIAN_THRESHOLD"):
+            Config.from_env({"CONTEXT_GUARDIAN_THRESHOLD": "high"})
@@ -0,0 +1,200 @@
+"""Tests for the Unix socket control API."""
+
+import socket
+import threading
+from typing import Generator
+from unittest.mock import patch
+
+import pytest
+
+from context_guardian.config import Config
+from context_guardian.control import (
+    ControlClient,
+    ControlError,
+    ControlServer,
+    NotRunningError,
+    RemoteGuardian,
+)
+from context_guardian.daemon import ContextGuardian
+from context_guardian.main import cli
+from context_guardian.parser import ContextUsage
+
+
+@pytest.fixture
+def guardian(config: Config) -> ContextGuardian:
+    """Guardian with a cached reading and no openclaw access."""
+    guardian = ContextGuardian(config)
+    usage = ContextUsage(used_tokens=84000, limit_tokens=200000, percentage=42)
+    with patch.object(guardian, "get_context_usage", return_value=usage):
+        guardian.check_and_handle()
+    return guardian
+
+
+@pytest.fixture
+def server(guardian: ContextGuardian) -> Generator[ControlServer, None, None]:
+    """Control server running for the guardian."""
+    server = ControlServer(guardian)
+    server.start()
+    yield server
+    server.stop()
+
+
+class TestControlServer:
+    """Tests for ControlServer and ControlClient."""
+
+    def test_status_served_from_memory(self, server: ControlServer) -> None:
+        """Test status does not query openclaw."""
+        client = ControlClient(server.path)
+        with patch.object(server.guardian, "get_context_usage") as get_usage:
+            status = client.request("status")
+        get_usage.assert_not_called()
+        assert status["threshold"] == 75
+        assert status["usage"]["percentage"] == 42
+        assert status["history_events"] == 1
+        assert status["last_check"] is not None
+
+    def test_history(self, server: ControlServer) -> None:
+        """Test history returns recent events."""
+        events = ControlClient(server.path).request("history", limit=5)
+        assert len(events) == 1
+        assert events[0]["action"] == "check"
+
+    def test_set_threshold(self, server: ControlServer) -> None:
+        """Test set-threshold updates the running guardian."""
+        result = ControlClient(server.path).request("set-threshold", percentage=80)
+        assert result == {"threshold": 80}
+        assert server.guardian.config.threshold == 80
+
+    def test_set_threshold_invalid(self, server: ControlServer) -> None:
+        """Test invalid threshold is reported as an error."""
+        with pytest.raises(ControlError, match="50-95"):
+            ControlClient(server.path).request("set-threshold", percentage=20)
+        assert server.guardian.config.threshold == 75
+
+    def test_check(self, server: ControlServer) -> None:
+        """Test check runs on the running guardian."""
+        usage = ContextUsage(used_tokens=100000, limit_tokens=200000, percentage=50)
+        with patch.object(server.guardian, "get_context_usage", return_value=usage):
+            result = ControlClient(server.path).request("check")
+        assert result == {"success": True}
+        assert server.guardian.get_status(refresh=False)["usage"]["percentage"] == 50
+
+    def test_status_during_check(self, server: ControlServer) -> None:
+        """Test status is answered while a check is waiting on openclaw."""
+        in_openclaw, release = threading.Event(), threading.Event()
+        usage = ContextUsage(used_tokens=100000, limit_tokens=200000, percentage=50)
+
+        def slow_usage() -> ContextUsage:
+            in_openclaw.set()
+            release.wait(5)
+            return usage
+
+        with patch.object(server.guardian, "get_context_usage", side_effect=slow_usage):
+            check = threading.Thread(target=server.guardian.check_and_handle)
+            check.start()
+            try:
+                assert in_openclaw.wait(5)
+                status = ControlClient(server.path).request("status", timeout=1)
+                assert status["usage"]["percentage"] == 42
+            finally:
+                release.set()
+                check.join(5)
+        assert server.guardian.get_status(refresh=False)["usage"]["percentage"] == 50
+
+    def test_unexpected_error_reported(self, server: ControlServer) -> None:
+        """Test an unexpected failure is returned as an error, not a dropped connection."""
+        with patch.object(server.guardian, "get_status", side_effect=RuntimeError("boom")):
+            with pytest.raises(ControlError, match="boom"):
+                ControlClient(server.path).request("status")
+
+    def test_unknown_command(self, server: ControlServer) -> None:
+        """Test unknown commands are rejected."""
+        with pytest.raises(ControlError, match="Unknown command"):
+            ControlClient(server.path).request("reboot")
+
+    def test_second_server_refused(self, server: ControlServer) -> None:
+        """Test a second guardian cannot take over a live socket."""
+        with pytest.raises(RuntimeError, match="already running"):
+            ControlServer(server.guardian).start()
+
+    def test_stale_socket_replaced(self, guardian: ContextGuardian) -> None:
+        """Test a socket left behind by a dead guardian is replaced."""
+        path = guardian.config.control_socket
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(path))
+        stale.close()
+
+        server = ControlServer(guardian)
+        server.start()
+        try:
+            assert ControlClient(path).is_running()
+        finally:
+            server.stop()
+        assert not path.exists()
+
+    def test_not_running(self, config: Config) -> None:
+        """Test client reports no guardian when the socket is absent."""
+        assert not ControlClient(config.control_socket).is_running()
+        with pytest.raises(NotRunningError):
+            RemoteGuardian(config).get_status()
+
+    def test_socket_dir_private(self, server: ControlServer) -> None:
+        """Test the socket directory is only accessible to its owner."""
+        assert server.path.parent.stat().st_mode & 0o777 == 0o700
+
+    def test_refuses_foreign_socket_dir(self, guardian: ContextGuardian) -> None:
+        """Test the server will not bind in a directory another user owns."""
+        uid = guardian.config.control_socket.parent.stat().st_uid
+        with patch("context_guardian.control.os.getuid", return_value=uid + 1):
+            with pytest.raises(RuntimeError, match="not owned"):
+                ControlServer(guardian).start()
+
+    def test_client_rejects_foreign_socket(self, server: ControlServer) -> None:
+        """Test the client does not trust a socket another user owns."""
+        uid = server.path.stat().st_uid
+        with patch("context_guardian.control.os.getuid", return_value=uid + 1):
+            with pytest.raises(NotRunningError, match="not owned"):
+                ControlClient(server.path).request("status")
+
+
+class TestCliClient:
+    """Tests for CLI commands routed through a running guardian."""
+
+    def test_status_uses_running_guardian(
+        self, server: ControlServer, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test status does not build a standalone guardian."""
+        with patch(
+            "context_guardian.main.Config.from_env", return_value=server.guardian.config
+        ), patch("context_guardian.main.ContextGuardian") as standalone:
+            assert cli(["status"]) == 0
+        standalone.assert_not_called()
+        assert "Usage: 42% (84000/200000 tokens)" in capsys.readouterr().out
+
+    def test_status_single_round_trip(self, server: ControlServer) -> None:
+        """Test status costs one request, with no separate liveness probe."""
+        with patch(
+            "context_guardian.main.Config.from_env", return_value=server.guardian.config
+        ), patch(
+            "context_guardian.control.ControlClient.request",
+            wraps=ControlClient(server.path).request,
+        ) as request:
+            assert cli(["status"]) == 0
+        request.assert_called_once_with("status")
+
+    def test_set_threshold_invalid(
+        self, server: ControlServer, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test set-threshold errors from the guardian are reported."""
+        with patch("context_guardian.main.Config.from_env", return_value=server.guardian.config):
+            assert cli(["set-threshold", "99"]) == 1
+        assert "Threshold must be 50-95%" in capsys.readouterr().out
+
+    def test_standalone_fallback(self, config: Config) -> None:
+        """Test commands fall back to a standalone guardian."""
+        with patch("context_guardian.main.Config.from_env", return_value=config), patch(
+            "context_guardian.main.ContextGuardian"
+        ) as standalone:
+            standalone.return_value.check_and_handle.return_value = True
+            assert cli(["check"]) == 0
+        standalone.assert_called_once_with(config, deliver_alerts=True)
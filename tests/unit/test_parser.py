@@ -5,6 +5,7 @@ import pytest
 from context_guardian.parser import (
     ContextLevel,
     ContextUsage,
+    parse_openclaw_sessions,
     parse_openclaw_status,
     parse_token_count,
 )
@@ -113,3 +114,26 @@ class TestParsing:
         assert result is not None
         assert result.used_tokens == expected_used
         assert result.limit_tokens == expected_limit
+
+
+class TestSessionParsing:
+    """Tests for parse_openclaw_sessions function."""
+
+    def test_parse_single_session(self, openclaw_status_output: str) -> None:
+        """Test parsing the session table."""
+        sessions = parse_openclaw_sessions(openclaw_status_output)
+        assert list(sessions) == ["agent:main:main"]
+        assert sessions["agent:main:main"].used_tokens == 84000
+
+    def test_parse_multiple_sessions(self) -> None:
+        """Test parsing several sessions."""
+        output = """│ agent:main:main │ 84k/200k (42%) │
+│ agent:ops:main  │ 1.5m/2m (75%)  │
+"""
+        sessions = parse_openclaw_sessions(output)
+        assert sessions["agent:main:main"].percentage == 42
+        assert sessions["agent:ops:main"].used_tokens == 1_500_000
+
+    def test_parse_no_sessions(self) -> None:
+        """Test output without a session table."""
+        assert parse_openclaw_sessions("100k/200k (50%)") == {}
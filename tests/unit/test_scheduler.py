@@ -0,0 +1,248 @@
+"""Tests for idle-window-aware compaction scheduling."""
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from context_guardian.config import Config
+from context_guardian.daemon import ContextGuardian
+from context_guardian.parser import ContextUsage
+from context_guardian.scheduler import CompactionDecision, CompactionScheduler
+from tests.fixtures.readings import FakeClock, usage
+
+
+@pytest.fixture
+def scheduler(config: Config, clock: FakeClock) -> CompactionScheduler:
+    """Scheduler with a 60s idle gap and 90% must-compact threshold."""
+    config.idle_gap = 60
+    config.must_compact_threshold = 90
+    config.max_compaction_delay = 900
+    return CompactionScheduler(config, clock=clock)
+
+
+def step(scheduler: CompactionScheduler, reading: ContextUsage) -> CompactionDecision:
+    """Observe a reading and decide."""
+    scheduler.observe(reading)
+    return scheduler.decide(reading)
+
+
+class TestCompactionScheduler:
+    """Tests for CompactionScheduler decisions."""
+
+    def test_below_threshold_skips(self, scheduler: CompactionScheduler) -> None:
+        """Test no compaction below the threshold."""
+        assert step(scheduler, usage(100000)) is CompactionDecision.SKIP
+        assert not scheduler.pending
+
+    def test_defers_while_active(self, scheduler: CompactionScheduler, clock: FakeClock) -> None:
+        """Test compaction waits while tokens keep growing."""
+        step(scheduler, usage(140000))
+        clock.now += 15
+        assert step(scheduler, usage(152000)) is CompactionDecision.DEFER
+        clock.now += 15
+        assert step(scheduler, usage(156000)) is CompactionDecision.DEFER
+        assert scheduler.pending
+
+    def test_compacts_after_idle_gap(
+        self, scheduler: CompactionScheduler, clock: FakeClock
+    ) -> None:
+        """Test compaction runs once tokens stop changing for the idle gap."""
+        step(scheduler, usage(140000))
+        clock.now += 15
+        assert step(scheduler, usage(152000)) is CompactionDecision.DEFER
+        clock.now += 30
+        assert step(scheduler, usage(152000)) is CompactionDecision.DEFER
+        clock.now += 30
+        assert step(scheduler, usage(152000)) is CompactionDecision.IDLE
+
+    def test_stall_avoided_counted_for_deferred(
+        self, scheduler: CompactionScheduler, clock: FakeClock
+    ) -> None:
+        """Test a deferred idle compaction counts its duration as avoided stall."""
+        step(scheduler, usage(140000))
+        clock.now += 15
+        step(scheduler, usage(152000))
+        clock.now += 60
+        decision = step(scheduler, usage(152000))
+        scheduler.record_compaction(decision, 12.5)
+
+        stats = scheduler.get_stats()
+        assert stats["idle_compactions"] == 1
+        assert stats["stall_avoided_seconds"] == 12.5
+        assert not scheduler.pending
+
+    def test_already_idle_avoids_nothing(
+        self, scheduler: CompactionScheduler, clock: FakeClock
+    ) -> None:
+        """Test no stall is credited when the agent was idle at the crossing."""
+        scheduler.config.threshold = 80
+        step(scheduler, usage(152000))
+        clock.now += 300
+        scheduler.config.threshold = 75
+        decision = step(scheduler, usage(152000))
+        assert decision is CompactionDecision.IDLE
+        scheduler.record_compaction(decision, 12.5)
+        assert scheduler.get_stats()["stall_avoided_seconds"] == 0
+
+    def test_must_compact_threshold_forces(
+        self, scheduler: CompactionScheduler, clock: FakeClock
+    ) -> None:
+        """Test the must-compact threshold overrides activity."""
+        step(scheduler, usage(150000))
+        clock.now += 15
+        assert step(scheduler, usage(182000)) is CompactionDecision.FORCED
+
+    def test_deadline_forces(self, scheduler: CompactionScheduler, clock: FakeClock) -> None:
+        """Test a pending compaction is forced after max_compaction_delay."""
+        used = 150000
+        step(scheduler, usage(used))
+        for _ in range(60):
+            clock.now += 15
+            used += 100
+            decision = step(scheduler, usage(used))
+            if decision is not CompactionDecision.DEFER:
+                break
+        assert decision is CompactionDecision.FORCED
+        scheduler.record_compaction(decision, 5.0)
+        assert scheduler.get_stats()["forced_compactions"] == 1
+        assert scheduler.get_stats()["stall_avoided_seconds"] == 0
+
+    def test_drop_after_compaction_not_activity(
+        self, scheduler: CompactionScheduler, clock: FakeClock
+    ) -> None:
+        """Test the post-compaction token drop is not treated as activity."""
+        step(scheduler, usage(150000))
+        clock.now += 120
+        decision = step(scheduler, usage(150000))
+        scheduler.record_compaction(decision, 1.0)
+        last_activity = scheduler.last_activity
+
+        clock.now += 15
+        step(scheduler, usage(40000))
+        assert scheduler.last_activity == last_activity
+
+    def test_session_file_activity(
+        self, scheduler: CompactionScheduler, clock: FakeClock, tmp_path: Path
+    ) -> None:
+        """Test recently written session files keep compaction deferred."""
+        scheduler.config.session_dir = tmp_path
+        session = tmp_path / "agent" / "session.jsonl"
+        session.parent.mkdir()
+        session.write_text("{}\n")
+
+        step(scheduler, usage(150000))
+        clock.now += 120
+        os.utime(session, (clock.now - 5, clock.now - 5))
+        assert step(scheduler, usage(150000)) is CompactionDecision.DEFER
+
+    def test_state_persists(
+        self, scheduler: CompactionScheduler, config: Config, clock: FakeClock
+    ) -> None:
+        """Test a new scheduler resumes from the state file."""
+        step(scheduler, usage(140000))
+        clock.now += 15
+        step(scheduler, usage(152000))
+
+        resumed = CompactionScheduler(config, clock=clock)
+        assert resumed.pending
+        assert resumed.last_used == 152000
+        clock.now += 60
+        assert step(resumed, usage(152000)) is CompactionDecision.IDLE
+
+    def test_pending_persisted_without_defer(
+        self, scheduler: CompactionScheduler, config: Config, clock: FakeClock
+    ) -> None:
+        """Test the deadline survives one-shot runs that decide IDLE but never compact."""
+        scheduler.last_activity = clock.now - 120
+        assert step(scheduler, usage(150000)) is CompactionDecision.IDLE
+        started = scheduler.pending_since
+
+        # Each timer run builds a fresh scheduler; the held-back compaction never runs
+        for _ in range(3):
+            clock.now += 300
+            resumed = CompactionScheduler(config, clock=clock)
+            assert resumed.pending_since == started
+            decision = step(resumed, usage(150000))
+        assert decision is CompactionDecision.FORCED
+
+
+class TestGuardianScheduling:
+    """Tests for scheduling in ContextGuardian.check_and_handle."""
+
+    def test_deferred_then_compacted(self, config: Config, clock: FakeClock) -> None:
+        """Test the guardian only compacts once the agent is idle."""
+        guardian = ContextGuardian(config)
+        guardian.scheduler = CompactionScheduler(config, clock=clock)
+
+        with patch.object(guardian, "_compact", return_value=True) as compact:
+            for used in (140000, 152000):
+                with patch.object(guardian, "get_context_usage", return_value=usage(used)):
+                    assert guardian.check_and_handle()
+                clock.now += 15
+            compact.assert_not_called()
+
+            clock.now += 60
+            with patch.object(guardian, "get_context_usage", return_value=usage(152000)):
+                assert guardian.check_and_handle()
+            compact.assert_called_once()
+
+        assert guardian.get_status(refresh=False)["scheduler"]["idle_compactions"] == 1
+
+    def test_threshold_above_must_compact_rejected(self, config: Config) -> None:
+        """Test a threshold that would force every compaction is rejected."""
+        guardian = ContextGuardian(config)
+        with pytest.raises(ValueError, match="must-compact threshold"):
+            guardian.set_threshold(95)
+        assert guardian.config.threshold == 75
+
+
+class RecordingStop(threading.Event):
+    """Stop event that records loop waits and stops after ``ticks`` of them."""
+
+    def __init__(self, ticks: int) -> None:
+        super().__init__()
+        self.ticks = ticks
+        self.waits: list[Optional[float]] = []
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self.waits.append(timeout)
+        if len(self.waits) >= self.ticks:
+            self.set()
+        return self.is_set()
+
+
+class TestRunLoop:
+    """Tests for the polling interval chosen by ContextGuardian.run."""
+
+    def test_polls_fast_while_deferred(self, config: Config, clock: FakeClock) -> None:
+        """Test the loop polls at idle_poll_interval while waiting for idle."""
+        guardian = ContextGuardian(config)
+        guardian.scheduler = CompactionScheduler(config, clock=clock)
+        readings = iter([usage(140000), usage(152000)])
+
+        def next_reading() -> ContextUsage:
+            clock.now += 15
+            return next(readings)
+
+        stop = RecordingStop(ticks=2)
+        with patch.object(guardian, "get_context_usage", side_effect=next_reading):
+            guardian.run(stop)
+        assert stop.waits == [config.check_interval, config.idle_poll_interval]
+
+    def test_failed_compaction_not_retried_fast(self, config: Config, clock: FakeClock) -> None:
+        """Test a failing compaction is retried at check_interval, not idle_poll_interval."""
+        guardian = ContextGuardian(config)
+        guardian.scheduler = CompactionScheduler(config, clock=clock)
+        stop = RecordingStop(ticks=3)
+
+        with patch.object(guardian, "get_context_usage", return_value=usage(190000)), patch.object(
+            guardian, "_compact", return_value=False
+        ) as compact:
+            guardian.run(stop)
+
+        assert compact.call_count == 3
+        assert stop.waits == [config.check_interval] * 3
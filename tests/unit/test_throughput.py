@@ -0,0 +1,203 @@
+"""Tests for token throughput accounting."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from context_guardian.config import Config
+from context_guardian.daemon import DEFAULT_SESSION, ContextGuardian
+from context_guardian.throughput import RateCounter, ThroughputMeter
+from tests.fixtures.readings import FakeClock, usage
+
+
+@pytest.fixture
+def meter(config: Config, clock: FakeClock) -> ThroughputMeter:
+    """Throughput meter on a fake clock."""
+    return ThroughputMeter(config, clock=clock)
+
+
+class TestRateCounter:
+    """Tests for RateCounter."""
+
+    def test_total_within_window(self) -> None:
+        """Test values inside the window are summed."""
+        counter = RateCounter(window=60, buckets=6)
+        counter.add(100, 0)
+        counter.add(50, 30)
+        assert counter.total(59) == 150
+
+    def test_old_buckets_expire(self) -> None:
+        """Test values older than the window drop out."""
+        counter = RateCounter(window=60, buckets=6)
+        counter.add(100, 0)
+        counter.add(50, 30)
+        assert counter.total(65) == 50
+        assert counter.total(200) == 0
+
+    def test_reused_slot_resets(self) -> None:
+        """Test a ring slot is cleared when it wraps around."""
+        counter = RateCounter(window=60, buckets=6)
+        counter.add(100, 0)
+        counter.add(7, 60)
+        assert counter.counts.count(0) == 5
+        assert counter.total(60) == 7
+
+    def test_rate(self) -> None:
+        """Test rate scaling."""
+        counter = RateCounter(window=300, buckets=10)
+        counter.add(1500, 0)
+        assert counter.rate(10, 60) == 300
+
+    def test_add_over_spreads(self) -> None:
+        """Test a value accrued over an interval is spread across its buckets."""
+        counter = RateCounter(window=60, buckets=6)
+        counter.add_over(60, 0, 30)
+        assert counter.counts[:3] == [20, 20, 20]
+
+    def test_add_over_keeps_window_share(self) -> None:
+        """Test only the share of a long interval inside the window is kept."""
+        counter = RateCounter(window=60, buckets=6)
+        counter.add_over(120, 0, 120)
+        assert counter.total(120) == 50
+
+
+class TestThroughputMeter:
+    """Tests for ThroughputMeter."""
+
+    def test_per_agent_and_fleet(self, meter: ThroughputMeter, clock: FakeClock) -> None:
+        """Test deltas are counted per agent and in aggregate."""
+        meter.observe({"a": usage(10000), "b": usage(20000)})
+        clock.now += 60
+        meter.observe({"a": usage(13000), "b": usage(21000)})
+
+        stats = meter.get_stats()
+        assert stats["agents"]["a"]["tokens_per_hour"] == 3000
+        assert stats["agents"]["b"]["tokens_per_hour"] == 1000
+        assert stats["fleet"]["tokens_per_hour"] == 4000
+        assert stats["fleet"]["tokens_per_minute"] == 800
+
+    def test_compaction_drop_is_new_baseline(
+        self, meter: ThroughputMeter, clock: FakeClock
+    ) -> None:
+        """Test a drop in used_tokens is not counted as negative throughput."""
+        meter.observe({"a": usage(150000)})
+        clock.now += 60
+        meter.observe({"a": usage(40000)})
+        clock.now += 60
+        meter.observe({"a": usage(45000)})
+        assert meter.get_stats()["agents"]["a"]["tokens_per_hour"] == 5000
+
+    def test_infrequent_checks(self, meter: ThroughputMeter, clock: FakeClock) -> None:
+        """Test checks further apart than the minute window do not inflate the rate."""
+        used = 10000
+        meter.observe({"a": usage(used)})
+        for _ in range(6):
+            clock.now += 600
+            used += 10000  # steady 1000 tokens/min
+            meter.observe({"a": usage(used)})
+
+        fleet = meter.get_stats()["fleet"]
+        assert 900 <= fleet["tokens_per_minute"] <= 1000
+        assert 57000 <= fleet["tokens_per_hour"] <= 60000
+
+    def test_gap_longer_than_hour_is_new_baseline(self, config: Config, clock: FakeClock) -> None:
+        """Test growth across a gap longer than the hour window is not counted."""
+        config.throughput_budget = 1000
+        meter = ThroughputMeter(config, clock=clock)
+        meter.observe({"a": usage(10000)})
+
+        clock.now += 7200
+        resumed = ThroughputMeter(config, clock=clock)
+        hook = MagicMock()
+        resumed.budget_hooks.append(hook)
+        resumed.observe({"a": usage(70000)})
+        assert resumed.get_stats()["fleet"]["tokens_per_hour"] == 0
+
+        clock.now += 60
+        resumed.observe({"a": usage(70500)})
+        assert resumed.get_stats()["agents"]["a"]["tokens_per_hour"] == 500
+        assert not resumed.near_budget()
+        hook.assert_not_called()
+
+    def test_departed_agents_pruned(self, meter: ThroughputMeter, clock: FakeClock) -> None:
+        """Test agents unseen for over an hour are forgotten."""
+        meter.observe({"a": usage(10000)})
+        clock.now += 3601
+        meter.observe({"b": usage(10000)})
+        assert list(meter.agents) == ["b"]
+
+    def test_state_persists(self, meter: ThroughputMeter, config: Config, clock: FakeClock) -> None:
+        """Test counters survive a restart."""
+        meter.observe({"a": usage(10000)})
+        clock.now += 60
+        meter.observe({"a": usage(12000)})
+
+        resumed = ThroughputMeter(config, clock=clock)
+        assert resumed.get_stats()["agents"]["a"]["tokens_per_hour"] == 2000
+        clock.now += 60
+        resumed.observe({"a": usage(13000)})
+        assert resumed.get_stats()["fleet"]["tokens_per_hour"] == 3000
+
+    def test_budget_hook(self, config: Config, clock: FakeClock) -> None:
+        """Test hooks fire once when the fleet nears the budget."""
+        config.throughput_budget = 1000
+        meter = ThroughputMeter(config, clock=clock)
+        hook = MagicMock()
+        meter.budget_hooks.append(hook)
+
+        meter.observe({"a": usage(10000)})
+        assert not meter.near_budget()
+        for used in (15000, 16000):
+            clock.now += 60
+            meter.observe({"a": usage(used)})
+
+        assert meter.near_budget()
+        hook.assert_called_once()
+        assert hook.call_args[0][0]["near_budget"]
+
+    def test_no_budget(self, meter: ThroughputMeter, clock: FakeClock) -> None:
+        """Test budget checks are off without a budget."""
+        meter.observe({"a": usage(10000)})
+        clock.now += 60
+        meter.observe({"a": usage(190000)})
+        assert not meter.near_budget()
+
+
+class TestGuardianThroughput:
+    """Tests for throughput accounting in ContextGuardian."""
+
+    def test_sessions_from_status_output(self, config: Config, openclaw_status_output: str) -> None:
+        """Test per-session rows from openclaw status are metered."""
+        guardian = ContextGuardian(config)
+        result = MagicMock(stdout=openclaw_status_output, stderr="")
+        with patch("context_guardian.daemon.subprocess.run", return_value=result):
+            assert guardian.check_and_handle()
+        assert "agent:main:main" in guardian.throughput.agents
+
+    def test_history_and_status(self, config: Config, clock: FakeClock) -> None:
+        """Test rates are exposed in history and status."""
+        guardian = ContextGuardian(config)
+        guardian.throughput = ThroughputMeter(config, clock=clock)
+        for used in (50000, 56000):
+            with patch.object(guardian, "get_context_usage", return_value=usage(used)):
+                assert guardian.check_and_handle()
+            clock.now += 60
+
+        assert guardian.get_history(1)[0]["tokens_per_minute"] == 1200
+        status = guardian.get_status(refresh=False)
+        assert status["throughput"]["agents"][DEFAULT_SESSION]["tokens_per_hour"] == 6000
+
+    def test_budget_paces_idle_compaction(self, config: Config, clock: FakeClock) -> None:
+        """Test idle compactions wait while the fleet is near its budget."""
+        config.throughput_budget = 100
+        guardian = ContextGuardian(config)
+        guardian.throughput = ThroughputMeter(config, clock=clock)
+        guardian.scheduler.clock = clock
+
+        with patch.object(guardian, "_compact", return_value=True) as compact:
+            for used in (100000, 152000, 152000):
+                with patch.object(guardian, "get_context_usage", return_value=usage(used)):
+                    assert guardian.check_and_handle()
+                clock.now += 120
+            compact.assert_not_called()
+        assert guardian.scheduler.pending